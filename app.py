@@ -1,14 +1,18 @@
 """FXトレード記録・資産管理アプリケーション（メインファイル）"""
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+import io
 import os
 from src.data_manager import TradeDataManager, TradeAnalyzer, StrategyManager
 from src.config import Config
 from src.strategy_storage import StrategyStorage
-from src.strategy_page import strategy_management_page_new
+from src.template_storage import TemplateStorage
+from src.strategy_page import strategy_management_page_new, strategy_trades_display, ranking_markdown, profit_bar_colors, PLOTLY_CONFIG
 import position_calculator as pc
 
 # ページ設定（最初に一度だけ呼ばれる）
@@ -22,432 +26,22 @@ st.set_page_config(
 # セッションステートの初期化
 if 'strategy_rules' not in st.session_state:
     st.session_state.strategy_rules = {}
-if 'strategy_templates' not in st.session_state:
-    st.session_state.strategy_templates = {}
 if 'strategy_manager' not in st.session_state:
     st.session_state.strategy_manager = None
-if 'strategy_storage' not in st.session_state:
-    st.session_state.strategy_storage = None
+if 'data_version' not in st.session_state:
+    st.session_state.data_version = 0
 
-# カスタムCSS - 最新モダンデザイン
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
-    
-    * {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-    
-    /* Streamlitデフォルト要素を非表示 */
-    header[data-testid="stHeader"] {
-        display: none;
-    }
-    
-    .main .block-container {
-        padding-top: 0;
-        padding-bottom: 4rem;
-        max-width: 100%;
-    }
-    
-    .main {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        background-attachment: fixed;
-    }
-    
-    /* スティッキーヘッダー */
-    .fixed-header-container {
-        position: -webkit-sticky !important;
-        position: sticky !important;
-        top: 0 !important;
-        z-index: 9999 !important;
-        background: rgba(255, 255, 255, 0.98) !important;
-        backdrop-filter: blur(25px) saturate(180%) !important;
-        -webkit-backdrop-filter: blur(25px) saturate(180%) !important;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1) !important;
-        border-bottom: 1px solid rgba(226, 232, 240, 0.5) !important;
-        padding: 1rem 3rem !important;
-        margin: -2rem -3rem 2rem -3rem !important;
-        width: calc(100% + 6rem) !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    }
-
-    /* スクロール時のヘッダースタイル */
-    .fixed-header-container.scrolled {
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.15) !important;
-        background: rgba(255, 255, 255, 1) !important;
-    }
-
-    /* marker自体は高さを取らない */
-    .fixed-header-container > div[data-testid="stMarkdown"] {
-        height: 0 !important;
-        margin: 0 !important;
-        padding: 0 !important;
-    }
 
-    /* ヘッダー行（columnsの横並び）を"header-content"相当に整形 */
-    .fixed-header-container > div[data-testid="stHorizontalBlock"] {
-        max-width: 1800px;
-        margin: 0 auto;
-        min-height: 72px;
-        align-items: center !important;
-        gap: 2rem;
-    }
-    
-    .header-brand {
-        display: flex;
-        align-items: center;
-        gap: 0.75rem;
-        flex-shrink: 0;
-    }
-    
-    .brand-logo {
-        font-size: 1.75rem;
-        filter: drop-shadow(0 2px 4px rgba(102, 126, 234, 0.3));
-    }
-    
-    .brand-title {
-        font-size: 1.5rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        letter-spacing: -0.03em;
-        margin: 0;
-        white-space: nowrap;
-    }
-    
-    .header-center {
-        flex: 1;
-        display: flex;
-        justify-content: center;
-    }
-    
-    .header-actions {
-        flex-shrink: 0;
-    }
-    
-    /* ヘッダー内のナビゲーション（radio） */
-    .fixed-header-container .stRadio > div {
-        background: rgba(249, 250, 251, 0.8);
-        padding: 0.375rem;
-        border-radius: 12px;
-        backdrop-filter: blur(10px);
-    }
+# カスタムCSS - 最新モダンデザイン（assets/app.css）
+@st.cache_resource
+def _load_css() -> str:
+    """カスタムCSSを読み込む（ディスクからの読み込みはプロセスごとに1回）"""
+    css_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'app.css')
+    with open(css_path, 'r', encoding='utf-8') as f:
+        return f.read()
 
-    .fixed-header-container .stRadio [role="radiogroup"] {
-        gap: 0.5rem;
-        display: flex;
-        flex-wrap: nowrap;
-        justify-content: center;
-    }
 
-    .fixed-header-container .stRadio [role="radiogroup"] > label {
-        background: transparent;
-        padding: 0.55rem 1.0rem;
-        border-radius: 8px;
-        font-weight: 600;
-        font-size: 0.85rem;
-        color: #6b7280;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        cursor: pointer;
-        border: none;
-        white-space: nowrap;
-    }
-
-    .fixed-header-container .stRadio [role="radiogroup"] > label:hover {
-        background: rgba(255, 255, 255, 0.8);
-        color: #111827;
-        transform: translateY(-1px);
-    }
-
-    .fixed-header-container .stRadio [role="radiogroup"] > label[data-checked="true"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-    }
-    
-    /* ヘッダー内の更新ボタン */
-    .fixed-header-container .stButton > button {
-        background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%);
-        color: white;
-        border: none;
-        border-radius: 10px;
-        padding: 0.75rem 1.5rem;
-        font-weight: 600;
-        font-size: 0.875rem;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        box-shadow: 0 4px 15px rgba(245, 158, 11, 0.3);
-        white-space: nowrap;
-    }
-
-    .fixed-header-container .stButton > button:hover {
-        background: linear-gradient(135deg, #d97706 0%, #b45309 100%);
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(245, 158, 11, 0.4);
-    }
-
-    
-    /* スペーサー */
-    .header-spacer {
-        height: 88px;
-    }
-    
-    /* コンテンツエリア */
-    .content-wrapper {
-        max-width: 1800px;
-        margin: 0 auto;
-        padding: 2rem 3rem;
-    }
-    
-    /* カード */
-    .modern-card {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(20px);
-        border-radius: 20px;
-        padding: 2rem;
-        box-shadow: 0 20px 60px rgba(0, 0, 0, 0.12);
-        border: 1px solid rgba(255, 255, 255, 0.18);
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    
-    .modern-card:hover {
-        transform: translateY(-4px);
-        box-shadow: 0 30px 80px rgba(0, 0, 0, 0.16);
-    }
-    
-    /* タイトル */
-    h1 {
-        color: #ffffff;
-        font-weight: 800;
-        font-size: 2.5rem;
-        letter-spacing: -0.03em;
-        margin-bottom: 1.5rem;
-        text-shadow: 0 2px 20px rgba(0, 0, 0, 0.15);
-    }
-    
-    h2 {
-        color: #111827;
-        font-weight: 700;
-        font-size: 1.75rem;
-        letter-spacing: -0.025em;
-        margin-top: 2.5rem;
-        margin-bottom: 1.25rem;
-    }
-    
-    h3 {
-        color: #374151;
-        font-weight: 600;
-        font-size: 1.25rem;
-        margin-top: 1.5rem;
-        margin-bottom: 1rem;
-    }
-    
-    /* メトリック */
-    [data-testid="stMetricValue"] {
-        font-size: 2.25rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-    
-    [data-testid="stMetricLabel"] {
-        color: #6b7280;
-        font-size: 0.8125rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.1em;
-    }
-    
-    .stMetric {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(20px);
-        padding: 1.75rem;
-        border-radius: 16px;
-        box-shadow: 0 10px 40px rgba(0, 0, 0, 0.08);
-        border: 1px solid rgba(255, 255, 255, 0.18);
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    
-    .stMetric:hover {
-        transform: translateY(-4px) scale(1.02);
-        box-shadow: 0 20px 60px rgba(102, 126, 234, 0.2);
-    }
-    
-    /* 通常ボタン */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 10px;
-        padding: 0.75rem 1.5rem;
-        font-weight: 600;
-        font-size: 0.875rem;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-        letter-spacing: -0.0125em;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-    }
-    
-    .stButton > button:active {
-        transform: translateY(0);
-    }
-    
-    /* データフレーム */
-    [data-testid="stDataFrame"] {
-        background: white;
-        border-radius: 16px;
-        overflow: hidden;
-        border: 1px solid rgba(226, 232, 240, 0.8);
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.06);
-    }
-    
-    [data-testid="stDataFrame"] th {
-        background: linear-gradient(135deg, #f9fafb 0%, #f3f4f6 100%) !important;
-        color: #374151 !important;
-        font-weight: 700 !important;
-        font-size: 0.75rem !important;
-        text-transform: uppercase;
-        letter-spacing: 0.1em;
-        padding: 1rem !important;
-        border-bottom: 2px solid #e5e7eb !important;
-    }
-    
-    [data-testid="stDataFrame"] td {
-        padding: 0.875rem !important;
-        border-bottom: 1px solid #f3f4f6 !important;
-        font-size: 0.875rem;
-    }
-    
-    /* タブ */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 0.5rem;
-        background: rgba(255, 255, 255, 0.6);
-        padding: 0.5rem;
-        border-radius: 12px;
-        border: none;
-        backdrop-filter: blur(10px);
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        padding: 0.875rem 1.5rem;
-        font-weight: 600;
-        font-size: 0.875rem;
-        color: #6b7280;
-        border-radius: 8px;
-        border: none;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        background: transparent;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        color: #111827;
-        background: rgba(255, 255, 255, 0.8);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        color: white !important;
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.3);
-    }
-    
-    /* インプット */
-    .stTextInput > div > div > input,
-    .stTextArea > div > div > textarea,
-    .stSelectbox > div > div,
-    .stDateInput > div > div > input {
-        border-radius: 10px;
-        border: 2px solid #e5e7eb;
-        font-size: 0.875rem;
-        color: #111827;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        background: white;
-        padding: 0.75rem 1rem;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stTextArea > div > div > textarea:focus,
-    .stSelectbox > div > div:focus,
-    .stDateInput > div > div > input:focus {
-        border-color: #667eea;
-        box-shadow: 0 0 0 4px rgba(102, 126, 234, 0.1);
-    }
-    
-    /* Expander */
-    .streamlit-expanderHeader {
-        background: rgba(255, 255, 255, 0.8);
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(226, 232, 240, 0.8);
-        border-radius: 12px;
-        font-weight: 600;
-        color: #374151;
-        padding: 1rem 1.5rem;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    
-    .streamlit-expanderHeader:hover {
-        background: white;
-        border-color: #667eea;
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.15);
-    }
-    
-    /* Divider */
-    hr {
-        margin: 3rem 0;
-        border: none;
-        height: 1px;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.3), transparent);
-    }
-    
-    /* アラート */
-    [data-testid="stInfo"],
-    [data-testid="stWarning"],
-    [data-testid="stError"],
-    [data-testid="stSuccess"] {
-        border-radius: 12px;
-        padding: 1.25rem 1.5rem;
-        border: 1px solid;
-        backdrop-filter: blur(10px);
-        font-weight: 500;
-    }
-    
-    [data-testid="stInfo"] {
-        background: rgba(239, 246, 255, 0.9);
-        border-color: #93c5fd;
-        color: #1e40af;
-    }
-    
-    [data-testid="stWarning"] {
-        background: rgba(254, 243, 199, 0.9);
-        border-color: #fcd34d;
-        color: #92400e;
-    }
-    
-    [data-testid="stError"] {
-        background: rgba(254, 226, 226, 0.9);
-        border-color: #fca5a5;
-        color: #991b1b;
-    }
-    
-    [data-testid="stSuccess"] {
-        background: rgba(209, 250, 229, 0.9);
-        border-color: #6ee7b7;
-        color: #065f46;
-    }
-    
-    /* Plotlyチャート */
-    .js-plotly-plot {
-        border-radius: 16px;
-        overflow: hidden;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.06);
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{_load_css()}</style>", unsafe_allow_html=True)
 
 
 @st.cache_resource
@@ -482,11 +76,19 @@ def get_strategy_storage():
         return None
 
 
+@st.cache_resource
+def get_template_storage():
+    """TemplateStorageのシングルトンインスタンスを取得（手法テンプレートの保存先）"""
+    return TemplateStorage(json_path="strategy_templates.json")
+
+
 def get_strategy_manager():
     """StrategyManagerのインスタンスを取得（キャッシュ付き）"""
-    if st.session_state.strategy_manager is None:
+    strategy_storage = get_strategy_storage()
+    manager = st.session_state.strategy_manager
+    # st.cache_resource.clear()後はストレージが作り直されるため、同じインスタンスを共有するよう再生成する
+    if manager is None or manager.strategy_storage is not strategy_storage:
         print("StrategyManagerを初期化中...")
-        strategy_storage = get_strategy_storage()
         data_manager = get_data_manager()
         
         if strategy_storage:
@@ -505,6 +107,32 @@ def get_strategy_manager():
     return st.session_state.strategy_manager
 
 
+@st.cache_data(show_spinner=False, ttl=3600)
+def _fetch_raw(spreadsheet_id: str, version: int) -> pd.DataFrame:
+    """
+    Google Sheetsからトレードデータを取得（キャッシュ付き）
+    
+    Args:
+        spreadsheet_id: スプレッドシートID
+        version: データバージョン（st.session_state.data_version）。更新時に変わりキャッシュを無効化する
+    """
+    data_manager = get_data_manager()
+    if data_manager is None:
+        return None
+    # 画面で使用する列だけを取得する
+    df = data_manager.load_data(columns=TradeDataManager.REQUIRED_COLUMNS)
+    # 内容のハッシュは取得時に一度だけ計算し、派生データのキャッシュのキーに使う
+    # （data_versionはセッションごとの値のため、全セッション共有のキャッシュのキーには使えない）
+    TradeDataManager.content_hash(df)
+    return df
+
+
+def invalidate_data():
+    """トレードデータのキャッシュを無効化（次回のload_dataで再取得）"""
+    st.session_state.data_version = st.session_state.get('data_version', 0) + 1
+    _fetch_raw.clear()
+
+
 def load_data():
     """データを読み込む"""
     data_manager = get_data_manager()
@@ -513,7 +141,7 @@ def load_data():
     
     try:
         with st.spinner('データを読み込んでいます...'):
-            df = data_manager.load_data()
+            df = _fetch_raw(Config.GOOGLE_SHEETS_SPREADSHEET_ID, st.session_state.data_version)
             
         # データの検証
         if df is not None and not df.empty:
@@ -541,6 +169,139 @@ def load_data():
         return None
 
 
+# 分析結果のキャッシュ（TradeAnalyzerはハッシュできないため、dfを引数に取る）
+@st.cache_data(show_spinner=False)
+def _metrics(df: pd.DataFrame) -> dict:
+    """主要メトリクス（キャッシュ付き）"""
+    return TradeAnalyzer(df).calculate_metrics()
+
+
+# 資産曲線の最大描画点数（これを超える場合はLTTBで間引く）
+EQUITY_CURVE_MAX_POINTS = 2000
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets法で間引き後に残す点のインデックスを求める
+    
+    Args:
+        x: X座標（昇順の数値配列）
+        y: Y座標
+        n_out: 出力する点数
+    
+    Returns:
+        残す点のインデックス配列（先頭と末尾を含む）
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # 先頭と末尾を除いた点を n_out - 2 個のバケットに分割
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # 次のバケットの平均点
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # 前回選んだ点・次バケット平均点と作る三角形の面積が最大の点を選ぶ
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(area.argmax())
+        indices[i + 1] = prev
+    
+    return indices
+
+
+@st.cache_data(show_spinner=False)
+def _equity_curve(df: pd.DataFrame, max_points: int = EQUITY_CURVE_MAX_POINTS) -> pd.DataFrame:
+    """累積損益の推移（日付順、max_pointsを超える場合はLTTBで間引く。キャッシュ付き）"""
+    prepared = TradeAnalyzer(df).df
+    if 'cumulative_profit' not in prepared.columns or 'date' not in prepared.columns:
+        return pd.DataFrame()
+    
+    curve = prepared[['date', 'cumulative_profit']].dropna().sort_values('date')
+    if len(curve) > max_points:
+        x = curve['date'].to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+        y = curve['cumulative_profit'].to_numpy(dtype=np.float64)
+        curve = curve.iloc[_lttb_indices(x, y, max_points)]
+    return curve
+
+
+@st.cache_data(show_spinner=False)
+def _by_strategy(df: pd.DataFrame) -> pd.DataFrame:
+    """手法別の分析（キャッシュ付き）"""
+    return TradeAnalyzer(df).analyze_by_strategy()
+
+
+@st.cache_data(show_spinner=False)
+def _by_currency_pair(df: pd.DataFrame) -> pd.DataFrame:
+    """通貨ペア別の分析（キャッシュ付き）"""
+    return TradeAnalyzer(df).analyze_by_currency_pair()
+
+
+@st.cache_data(show_spinner=False)
+def _by_time_period(df: pd.DataFrame, period: str = 'M') -> pd.DataFrame:
+    """時間軸別の分析（キャッシュ付き）"""
+    return TradeAnalyzer(df).analyze_by_time_period(period)
+
+
+@st.cache_data(show_spinner=False)
+def _by_day_of_week(df: pd.DataFrame) -> pd.DataFrame:
+    """曜日別の分析（キャッシュ付き）"""
+    return TradeAnalyzer(df).analyze_by_day_of_week()
+
+
+@st.cache_data(show_spinner=False)
+def _by_market_session(df: pd.DataFrame) -> pd.DataFrame:
+    """市場セッション別の分析（キャッシュ付き）"""
+    return TradeAnalyzer(df).analyze_by_market_session()
+
+
+# 連敗履歴の表示列
+STREAK_DISPLAY_COLUMNS = ['trade_id', 'date', 'currency_pair', 'strategy', 'net_profit_loss_jpy']
+
+
+@st.cache_data(show_spinner=False)
+def _consecutive_losses(df: pd.DataFrame):
+    """連続損失の分析（キャッシュ付き）。各連敗には表示用のトレード行を添えて返す"""
+    analyzer = TradeAnalyzer(df)
+    max_consecutive, max_loss, streaks = analyzer.get_consecutive_losses()
+    available_cols = [col for col in STREAK_DISPLAY_COLUMNS if col in analyzer.df.columns]
+    streaks = [
+        {
+            'count': streak['count'],
+            'total_loss': streak['total_loss'],
+            'trades': analyzer.df.loc[streak['index'], available_cols]
+        }
+        for streak in streaks
+    ]
+    return max_consecutive, max_loss, streaks
+
+
+@st.cache_data(show_spinner=False)
+def _top_losses(df: pd.DataFrame, n: int = 5) -> pd.DataFrame:
+    """損失額上位のトレード（キャッシュ付き）"""
+    return TradeAnalyzer(df).get_top_losses(n)
+
+
+# ダッシュボードの「最近のトレード」に表示する件数
+RECENT_TRADES_LIMIT = 50
+
+
+def _profit_colors(col: pd.Series) -> np.ndarray:
+    """損益列の文字色を列単位で一括決定（正: 緑、負: 赤）"""
+    values = pd.to_numeric(col, errors='coerce')
+    return np.where(values > 0, 'color: green', np.where(values < 0, 'color: red', ''))
+
+
 def dashboard_page():
     """ダッシュボードページ"""
     st.title("📊 ダッシュボード")
@@ -563,8 +324,7 @@ def dashboard_page():
         """)
         return
     
-    analyzer = TradeAnalyzer(df)
-    metrics = analyzer.calculate_metrics()
+    metrics = _metrics(df)
     
     # メトリクス表示
     st.subheader("📈 主要メトリクス")
@@ -618,14 +378,13 @@ def dashboard_page():
     # 累積損益グラフ
     st.subheader("💰 累積損益推移（資産曲線）")
     
-    if 'cumulative_profit' in analyzer.df.columns and 'date' in analyzer.df.columns:
+    equity_curve = _equity_curve(df)
+    if not equity_curve.empty:
         fig = go.Figure()
         
-        df_sorted = analyzer.df.sort_values('date')
-        
-        fig.add_trace(go.Scatter(
-            x=df_sorted['date'],
-            y=df_sorted['cumulative_profit'],
+        fig.add_trace(go.Scattergl(
+            x=equity_curve['date'],
+            y=equity_curve['cumulative_profit'],
             mode='lines+markers',
             name='累積損益',
             line=dict(color='#1f77b4', width=2),
@@ -645,7 +404,7 @@ def dashboard_page():
             showlegend=True
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         
         # グラフ上のポイントをクリックした際の詳細（インタラクティブ機能の提案）
         st.info("💡 ヒント: グラフをズームしたり、特定の期間を選択して詳細を確認できます。")
@@ -656,7 +415,7 @@ def dashboard_page():
     
     # 月次損益
     st.subheader("📅 月次損益")
-    monthly_data = analyzer.analyze_by_time_period('M')
+    monthly_data = _by_time_period(df, 'M')
     
     if not monthly_data.empty:
         fig = go.Figure()
@@ -679,48 +438,42 @@ def dashboard_page():
             showlegend=False
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
     # 最近のトレード
     st.divider()
     st.subheader("🕐 最近のトレード")
     
-    recent_trades = df.sort_values('date', ascending=False)
+    recent_trades = df.nlargest(RECENT_TRADES_LIMIT, 'date')
     
     # 表示用にカラムを選択
     display_cols = ['trade_id', 'date', 'currency_pair', 'type', 'lot', 
                    'pips', 'net_profit_loss_jpy', 'strategy']
     
     if all(col in recent_trades.columns for col in display_cols):
-        display_df = recent_trades[display_cols].copy()
-        
-        # 日付を文字列形式に変換
-        if 'date' in display_df.columns:
-            display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
-        
-        # ロット数とpips数を小数第二位まで表示
-        if 'lot' in display_df.columns:
-            display_df['lot'] = display_df['lot'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else x)
-        if 'pips' in display_df.columns:
-            display_df['pips'] = display_df['pips'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else x)
+        # 日付は読み込み時に生成済みの文字列を使用（全体のコピーはしない）
+        display_df = TradeDataManager.build_display_frame(recent_trades, display_cols)
         
         # カラム名を日本語に変更
         display_df.columns = ['取引番号', '日付', '通貨ペア', 'タイプ', 'ロット', 
                              'pips', '合計損益', '手法']
         
-        # スタイリング
-        def highlight_profit(val):
-            if isinstance(val, (int, float)):
-                color = 'color: green' if val > 0 else 'color: red' if val < 0 else ''
-                return color
-            return ''
-        
-        styled_df = display_df.style.applymap(
-            highlight_profit, 
+        # スタイリング（列単位でまとめて色を決定）
+        styled_df = display_df.style.apply(
+            _profit_colors,
             subset=['合計損益', 'pips']
         )
         
-        st.dataframe(styled_df, use_container_width=True, hide_index=True)
+        # ロット数とpips数は数値のまま渡し、小数第二位の表示はフロントエンドで行う
+        st.dataframe(
+            styled_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'ロット': st.column_config.NumberColumn(format='%.2f'),
+                'pips': st.column_config.NumberColumn(format='%.2f')
+            }
+        )
 
 
 def analysis_page():
@@ -732,8 +485,6 @@ def analysis_page():
         st.warning("データがありません。")
         return
     
-    analyzer = TradeAnalyzer(df)
-    
     # タブで分析を分割
     tab1, tab2, tab3, tab4 = st.tabs([
         "手法別分析", "通貨ペア別分析", "時間軸分析", "保有時間分析"
@@ -741,38 +492,30 @@ def analysis_page():
     
     with tab1:
         st.subheader("📊 手法別パフォーマンス")
-        strategy_analysis = analyzer.analyze_by_strategy()
+        strategy_analysis = _by_strategy(df)
         
         if not strategy_analysis.empty:
             # テーブル表示
             st.dataframe(strategy_analysis, use_container_width=True)
             
-            # グラフ表示
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                fig = px.bar(
-                    strategy_analysis.reset_index(),
-                    x='strategy',
-                    y='合計損益',
-                    title='手法別合計損益',
-                    color='合計損益',
-                    color_continuous_scale=['red', 'yellow', 'green']
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                fig = px.bar(
-                    strategy_analysis.reset_index(),
-                    x='strategy',
-                    y='勝率',
-                    title='手法別勝率',
-                    color='勝率',
-                    color_continuous_scale='Blues'
-                )
-                fig.update_layout(height=400, yaxis_range=[0, 100])
-                st.plotly_chart(fig, use_container_width=True)
+            # グラフ表示（合計損益と勝率を1つのFigureにまとめて描画）
+            strategy_chart_df = strategy_analysis.reset_index()
+            fig = make_subplots(rows=1, cols=2, subplot_titles=('手法別合計損益', '手法別勝率'))
+            fig.add_trace(go.Bar(
+                x=strategy_chart_df['strategy'],
+                y=strategy_chart_df['合計損益'],
+                name='合計損益',
+                marker=dict(color=strategy_chart_df['合計損益'], colorscale=['red', 'yellow', 'green'])
+            ), row=1, col=1)
+            fig.add_trace(go.Bar(
+                x=strategy_chart_df['strategy'],
+                y=strategy_chart_df['勝率'],
+                name='勝率',
+                marker=dict(color=strategy_chart_df['勝率'], colorscale='Blues')
+            ), row=1, col=2)
+            fig.update_yaxes(range=[0, 100], row=1, col=2)
+            fig.update_layout(height=400, showlegend=False)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             
             # パフォーマンスが悪い手法のフィルタリング
             st.subheader("⚠️ 改善が必要な手法")
@@ -790,34 +533,31 @@ def analysis_page():
     
     with tab2:
         st.subheader("💱 通貨ペア別パフォーマンス")
-        pair_analysis = analyzer.analyze_by_currency_pair()
+        pair_analysis = _by_currency_pair(df)
         
         if not pair_analysis.empty:
             st.dataframe(pair_analysis, use_container_width=True)
             
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                fig = px.bar(
-                    pair_analysis.reset_index(),
-                    x='currency_pair',
-                    y='合計損益',
-                    title='通貨ペア別合計損益',
-                    color='合計損益',
-                    color_continuous_scale=['red', 'yellow', 'green']
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                fig = px.pie(
-                    pair_analysis.reset_index(),
-                    values='取引数',
-                    names='currency_pair',
-                    title='通貨ペア別取引数割合'
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+            # 合計損益と取引数割合を1つのFigureにまとめて描画
+            pair_chart_df = pair_analysis.reset_index()
+            fig = make_subplots(
+                rows=1, cols=2,
+                specs=[[{'type': 'xy'}, {'type': 'domain'}]],
+                subplot_titles=('通貨ペア別合計損益', '通貨ペア別取引数割合')
+            )
+            fig.add_trace(go.Bar(
+                x=pair_chart_df['currency_pair'],
+                y=pair_chart_df['合計損益'],
+                name='合計損益',
+                marker=dict(color=pair_chart_df['合計損益'], colorscale=['red', 'yellow', 'green'])
+            ), row=1, col=1)
+            fig.add_trace(go.Pie(
+                values=pair_chart_df['取引数'],
+                labels=pair_chart_df['currency_pair'],
+                name='取引数'
+            ), row=1, col=2)
+            fig.update_layout(height=400)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         else:
             st.warning("通貨ペアデータがありません")
     
@@ -826,14 +566,14 @@ def analysis_page():
         
         # 月次分析
         st.write("**月次損益**")
-        monthly_data = analyzer.analyze_by_time_period('M')
+        monthly_data = _by_time_period(df, 'M')
         
         if not monthly_data.empty:
             st.dataframe(monthly_data, use_container_width=True)
         
         # 曜日別分析
         st.write("**曜日別パフォーマンス**")
-        dow_analysis = analyzer.analyze_by_day_of_week()
+        dow_analysis = _by_day_of_week(df)
         
         if not dow_analysis.empty:
             st.dataframe(dow_analysis, use_container_width=True)
@@ -842,11 +582,10 @@ def analysis_page():
                 dow_analysis.reset_index(),
                 x='day_name',
                 y='合計損益',
-                title='曜日別合計損益',
-                color='合計損益',
-                color_continuous_scale=['red', 'yellow', 'green']
+                title='曜日別合計損益'
             )
-            st.plotly_chart(fig, use_container_width=True)
+            fig.update_traces(marker_color=profit_bar_colors(dow_analysis['合計損益']))
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
 
 def position_calculator_page():
@@ -972,6 +711,77 @@ def position_calculator_page():
         
 
 
+def _category_options(df: pd.DataFrame, col: str) -> list:
+    """カテゴリ型の列から選択肢の一覧を取得（読み込み時にカテゴリ型に変換済み）"""
+    if col not in df.columns:
+        return []
+    if isinstance(df[col].dtype, pd.CategoricalDtype):
+        return [str(c) for c in df[col].cat.categories]
+    return sorted(df[col].dropna().astype(str).unique().tolist())
+
+
+def _clean_strategy_names(values) -> list:
+    """手法名の一覧をクリーンアップ（NaN/None/空文字/'none'を除外、重複削除、ソート）"""
+    names = pd.Series(list(values), dtype='string').str.strip()
+    names = names[names.notna() & (names != '') & ~names.str.lower().isin(['nan', 'none'])]
+    return sorted(names.unique())
+
+
+@st.cache_data(show_spinner=False)
+def _filter_options(df: pd.DataFrame) -> dict:
+    """フィルター用の選択肢（通貨ペア・タイプ）を一度だけ計算（キャッシュ付き。手法は_strategy_choicesを使用）"""
+    return {
+        'currency_pair': _category_options(df, 'currency_pair'),
+        'type': _category_options(df, 'type'),
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _merged_strategies(_df: pd.DataFrame, df_hash: int, storage_names: tuple) -> list:
+    """トレード履歴と保存済みテンプレートの手法をマージ（dfは読み込み時に計算した内容のハッシュで識別。キャッシュ付き）"""
+    return _clean_strategy_names(_category_options(_df, 'strategy') + list(storage_names))
+
+
+def _strategy_choices(df: pd.DataFrame) -> list:
+    """手法の選択肢（トレード履歴 + StrategyStorageに保存された手法）"""
+    storage = get_strategy_storage()
+    storage_names = tuple(storage.get_all_strategies().keys()) if storage else ()
+    return _merged_strategies(df, TradeDataManager.content_hash(df), storage_names)
+
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _filtered_trades(_df: pd.DataFrame, df_hash: int, filters_key: tuple) -> pd.DataFrame:
+    """フィルター適用後のトレード（dfは読み込み時に計算した内容のハッシュで識別。キャッシュ付き）"""
+    return TradeAnalyzer(_df).get_filtered_trades(dict(filters_key))
+
+
+def _has_pending_edits(editor_key: str) -> bool:
+    """data_editorに未保存の編集があるか（session_stateの編集記録を見るだけなのでO(1)）"""
+    state = st.session_state.get(editor_key)
+    return bool(state and (state.get('edited_rows') or state.get('added_rows') or state.get('deleted_rows')))
+
+
+def _collect_updates(edited: pd.DataFrame, original: pd.DataFrame, cols: list) -> list:
+    """
+    data_editorの編集前後を列単位で比較し、変更されたセルを (取引番号, 列名, 新しい値) のリストで返す
+    （NaN同士は変更なしとみなす）
+    """
+    changed = edited[cols].ne(original[cols]) & ~(edited[cols].isna() & original[cols].isna())
+    rows = changed.any(axis=1)
+    if not rows.any():
+        return []
+    
+    # 変更のあった行だけの最小の差分に絞ってから値を取り出す
+    changed = changed[rows]
+    subset = edited.loc[rows, ['trade_id'] + cols]
+    trade_ids = subset['trade_id'].to_numpy(dtype='int64', na_value=-1)
+    updates = []
+    for col in cols:
+        mask = changed[col].to_numpy()
+        updates.extend(zip(trade_ids[mask].tolist(), [col] * int(mask.sum()), subset.loc[mask, col]))
+    return updates
+
+
 def trade_log_page():
     """トレードログページ"""
     st.title("📋 トレードログ")
@@ -981,60 +791,38 @@ def trade_log_page():
         st.warning("データがありません。")
         return
     
-    analyzer = TradeAnalyzer(df)
-    
+    _trade_log_view(df)
+
+
+@st.cache_data(show_spinner=False)
+def _csv_bytes(_display_df: pd.DataFrame, df_hash: int, filters_key: tuple) -> bytes:
+    """表示中のトレード一覧をCSV（BOM付きUTF-8）に変換（元データの内容のハッシュとフィルター条件で識別。キャッシュ付き）"""
+    buf = io.BytesIO()
+    _display_df.to_csv(buf, index=False, encoding='utf-8-sig', chunksize=10000)
+    return buf.getvalue()
+
+
+@st.fragment
+def _trade_log_view(df: pd.DataFrame):
+    """フィルターとトレード一覧（フラグメント化してウィジェット操作時はこの部分のみ再実行）"""
     # フィルター
     st.subheader("🔎 フィルター")
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # 通貨ペアの選択肢（データは既にクリーニング済み）
-        if 'currency_pair' in df.columns:
-            valid_pairs = df['currency_pair'].dropna().unique()
-            valid_pairs = [str(p) for p in valid_pairs if p and str(p).strip()]
-            currency_pairs = ['すべて'] + sorted(set(valid_pairs))
-            # 説明付きラベルを表示するため、表示文字列 -> 内部値 のマッピングを使う
-            method_map = {
-                "pips（pips単位で入力）": "pips",
-                "price（価格差で入力）": "price",
-            }
-            method_value_to_display = {v: k for k, v in method_map.items()}
-            method = st.selectbox(
-                "損切り幅の入力形式",
-                options=list(method_value_to_display.keys()),
-                index=0,
-                format_func=lambda v: method_value_to_display[v],
-            )
-            valid_types = df['type'].dropna().unique()
-            valid_types = [str(t) for t in valid_types if t and str(t).strip()]
-            types = ['すべて'] + sorted(set(valid_types))
-        else:
-            types = ['すべて']
+        # 通貨ペアの選択肢（カテゴリ型のcategoriesは重複なし・ソート済み）
+        currency_pairs = ['すべて'] + _filter_options(df)['currency_pair']
+        selected_pair = st.selectbox("通貨ペア", currency_pairs)
+    
+    with col2:
+        # タイプの選択肢
+        types = ['すべて'] + _filter_options(df)['type']
         selected_type = st.selectbox("タイプ", types)
     
     with col3:
         # 手法の選択肢（トレード履歴 + 保存済みテンプレートをマージ）
-        df_strategies = []
-        if 'strategy' in df.columns:
-            df_strategies = df['strategy'].dropna().unique().tolist()
-
-        if not st.session_state.get('strategy_storage'):
-            try:
-                st.session_state.strategy_storage = StrategyStorage()
-            except Exception:
-                st.session_state.strategy_storage = None
-
-        storage_strategies = []
-        try:
-            if st.session_state.get('strategy_storage'):
-                storage_strategies = list(st.session_state.strategy_storage.get_all_strategies().keys())
-        except Exception:
-            storage_strategies = []
-
-        combined = list(df_strategies) + list(storage_strategies)
-        cleaned = [str(s).strip() for s in combined if pd.notna(s) and str(s).strip() and str(s).strip().lower() not in ['nan', 'none', '']]
-        strategies = ['すべて'] + sorted(list(set(cleaned))) if cleaned else ['すべて']
+        strategies = ['すべて'] + _strategy_choices(df)
         selected_strategy = st.selectbox("手法", strategies)
     
     col4, col5 = st.columns(2)
@@ -1043,23 +831,13 @@ def trade_log_page():
         use_date_filter = st.checkbox("日付でフィルター", value=False)
         
         if use_date_filter:
-            # 日付の範囲を取得（NaNを除外）
-            if 'date' in df.columns and not df['date'].isna().all():
-                valid_dates = pd.to_datetime(df['date']).dropna()
-                if not valid_dates.empty:
-                    min_date = valid_dates.min()
-                    max_date = valid_dates.max()
-                    # pd.Timestampをdatetime.dateに変換
-                    if hasattr(min_date, 'date'):
-                        min_date = min_date.date()
-                    if hasattr(max_date, 'date'):
-                        max_date = max_date.date()
-                else:
-                    min_date = datetime.now().date()
-                    max_date = datetime.now().date()
+            # 日付の範囲を取得（読み込み時にdatetime64に変換済みのためmin/maxのみ）
+            dates = df['date'] if 'date' in df.columns else pd.Series(dtype='datetime64[ns]')
+            min_date, max_date = dates.min(), dates.max()
+            if pd.isna(min_date):
+                min_date = max_date = datetime.now().date()
             else:
-                min_date = datetime.now().date()
-                max_date = datetime.now().date()
+                min_date, max_date = min_date.date(), max_date.date()
             
             date_range = st.date_input(
                 "期間",
@@ -1082,7 +860,9 @@ def trade_log_page():
         'only_losses': only_losses
     }
     
-    filtered_df = analyzer.get_filtered_trades(filters)
+    # 同じ条件での再実行（セル編集など）ではキャッシュ済みの結果を使う
+    filters_key = tuple(sorted(filters.items()))
+    filtered_df = _filtered_trades(df, TradeDataManager.content_hash(df), filters_key)
     
     # デバッグ: フィルター結果を確認
     print(f"[app.py] フィルター適用後のDataFrame行数: {len(filtered_df)}")
@@ -1122,77 +902,29 @@ def trade_log_page():
                        'strategy', 'review_comment']
         
         available_cols = [col for col in display_cols if col in filtered_df.columns]
-        display_df = filtered_df[available_cols].copy()
-        
-        # 日付・時刻を文字列形式に変換
-        if 'date' in display_df.columns:
-            display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
-        if 'start_time' in display_df.columns:
-            display_df['start_time'] = pd.to_datetime(display_df['start_time']).dt.strftime('%Y-%m-%d %H:%M')
-        if 'end_time' in display_df.columns:
-            display_df['end_time'] = pd.to_datetime(display_df['end_time']).dt.strftime('%Y-%m-%d %H:%M')
-        
-        # ロット数とpips数を小数第二位まで表示
-        if 'lot' in display_df.columns:
-            display_df['lot'] = display_df['lot'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else x)
-        if 'pips' in display_df.columns:
-            display_df['pips'] = display_df['pips'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else x)
+        # 日付・時刻は読み込み時に生成済みの文字列を使用（全体のコピーはしない）
+        display_df = TradeDataManager.build_display_frame(filtered_df, available_cols)
         
         # ソート（元のdateカラムでソート後に変換）
         display_df = display_df.sort_values('date', ascending=False)
         
-        # スタイリング関数（損益とpipsに色を付ける）
-        def color_profit_pips(val):
-            if isinstance(val, (int, float)):
-                if val > 0:
-                    return 'background-color: #d4edda; color: #155724'
-                elif val < 0:
-                    return 'background-color: #f8d7da; color: #721c24'
-            # 文字列の場合（小数第二位に変換後）
-            elif isinstance(val, str):
-                try:
-                    num_val = float(val)
-                    if num_val > 0:
-                        return 'background-color: #d4edda; color: #155724'
-                    elif num_val < 0:
-                        return 'background-color: #f8d7da; color: #721c24'
-                except:
-                    pass
-            return ''
-        
         # インタラクティブなテーブル（編集可能）
         st.write("💡 **ヒント:** strategyやreview_commentセルをダブルクリックすると、その場で編集できます")
         
         # 手法の選択肢を取得（編集用）: トレード履歴 + 保存済みテンプレートをマージ
         # StrategyStorage に保存された手法も含めることで、過去に未使用の手法も選べるようにする
-        df_strategies = []
-        if 'strategy' in df.columns:
-            df_strategies = df['strategy'].dropna().unique().tolist()
-
-        # ストレージから手法を取得（セッションに存在しなければ初期化）
-        if not st.session_state.get('strategy_storage'):
-            try:
-                st.session_state.strategy_storage = StrategyStorage()
-            except Exception:
-                st.session_state.strategy_storage = None
-
-        storage_strategies = []
-        try:
-            if st.session_state.get('strategy_storage'):
-                storage_dict = st.session_state.strategy_storage.get_all_strategies()
-                storage_strategies = list(storage_dict.keys())
-        except Exception:
-            storage_strategies = []
-
-        combined = list(df_strategies) + list(storage_strategies)
-        # クリーンアップ: NaN/None/empty/'none'を除外、重複削除、ソート
-        all_strategies = [str(s).strip() for s in combined if pd.notna(s) and str(s).strip() and str(s).strip().lower() not in ['nan', 'none', '']]
-        all_strategies = sorted(list(set(all_strategies)))
+        all_strategies = _strategy_choices(df)
+        
+        # 既存にない手法も選べるよう、カテゴリ型からobject型に戻す
+        if 'strategy' in display_df.columns:
+            display_df['strategy'] = display_df['strategy'].astype(object)
         
         # データエディターで編集可能にする
         editable_columns = ['strategy', 'review_comment']
         disabled_columns = [col for col in display_df.columns if col not in editable_columns]
         
+        # 保存後はdata_versionが変わり、キーが新しくなるため編集記録もリセットされる
+        editor_key = f"trade_table_editor_{st.session_state.data_version}"
         edited_df = st.data_editor(
             display_df,
             use_container_width=True,
@@ -1200,6 +932,10 @@ def trade_log_page():
             height=600,
             disabled=disabled_columns,
             column_config={
+                # 数値は文字列に変換せず、フロントエンドで書式を適用する
+                'lot': st.column_config.NumberColumn('lot', format='%.2f'),
+                'pips': st.column_config.NumberColumn('pips', format='%.2f'),
+                'net_profit_loss_jpy': st.column_config.NumberColumn('net_profit_loss_jpy', format='¥%.0f'),
                 'strategy': st.column_config.SelectboxColumn(
                     'strategy',
                     help='手法を選択できます',
@@ -1213,39 +949,28 @@ def trade_log_page():
                     width='large'
                 )
             },
-            key='trade_table_editor'
+            key=editor_key
         )
         
-        # 変更があれば保存ボタンを表示
-        if not edited_df.equals(display_df):
+        # 変更があれば保存ボタンを表示（全セル比較ではなくエディターの編集記録で判定）
+        if _has_pending_edits(editor_key):
             st.warning("⚠️ 変更が保存されていません")
             if st.button("💾 変更を保存", type="primary", key="save_review_changes"):
                 data_manager = get_data_manager()
                 if data_manager:
                     with st.spinner('保存中...'):
                         try:
-                            # 変更されたデータを取得
-                            changes_count = 0
-                            for idx in edited_df.index:
-                                # review_commentの変更をチェック
-                                if edited_df.loc[idx, 'review_comment'] != display_df.loc[idx, 'review_comment']:
-                                    trade_id = int(edited_df.loc[idx, 'trade_id'])
-                                    new_comment = edited_df.loc[idx, 'review_comment']
-                                    if data_manager.update_review_comment(trade_id, new_comment):
-                                        changes_count += 1
-                                
-                                # strategyの変更をチェック
-                                if edited_df.loc[idx, 'strategy'] != display_df.loc[idx, 'strategy']:
-                                    trade_id = int(edited_df.loc[idx, 'trade_id'])
-                                    new_strategy = edited_df.loc[idx, 'strategy']
-                                    if data_manager.update_strategy(trade_id, new_strategy):
-                                        changes_count += 1
+                            # 変更されたセルだけを抽出し、1回のリクエストでまとめて更新
+                            updates = _collect_updates(edited_df, display_df, ['review_comment', 'strategy'])
+                            # セルを編集して元に戻した場合などは、編集記録があっても保存する変更はない
+                            changes_count = data_manager.update_cells_bulk(updates) if updates else 0
                             
-                            if changes_count > 0:
-                                st.success(f"✅ {changes_count}件の変更を保存しました！")
-                                st.cache_resource.clear()
-                                import time
-                                time.sleep(1)
+                            if not updates:
+                                st.info("変更はありません")
+                            elif changes_count > 0:
+                                # トーストは再実行後も表示されるため、待機せずにすぐ再実行する
+                                st.toast(f"✅ {changes_count}件の変更を保存しました！")
+                                invalidate_data()
                                 st.rerun()
                             else:
                                 st.error("❌ 変更の保存に失敗しました")
@@ -1254,8 +979,8 @@ def trade_log_page():
                 else:
                     st.error("❌ データマネージャーの初期化に失敗しました")
         
-        # CSV エクスポート
-        csv = display_df.to_csv(index=False, encoding='utf-8-sig')
+        # CSV エクスポート（同じデータ・フィルター条件ではキャッシュ済みのバイト列を使う）
+        csv = _csv_bytes(display_df, TradeDataManager.content_hash(df), filters_key)
         st.download_button(
             label="📥 CSVダウンロード",
             data=csv,
@@ -1266,6 +991,75 @@ def trade_log_page():
         st.info("条件に一致するトレードがありません")
 
 
+@st.cache_data(show_spinner=False)
+def _loss_share_pie(_losses: pd.DataFrame, df_hash: int, selected_strategy: str,
+                    selected_pair: str, col: str, title: str) -> dict:
+    """負けトレードの割合を示す円グラフ（元データの内容のハッシュとフィルター条件で識別。キャッシュ付き）"""
+    counts = _losses.groupby(col, observed=True).size()
+    return px.pie(values=counts.values, names=counts.index, title=title).to_dict()
+
+
+@st.fragment
+def _losing_trades_editor(display_losses: pd.DataFrame, all_strategies: list):
+    """負けトレードの編集テーブルと保存ボタン（セル編集時はこのフラグメントのみ再実行）"""
+    st.write("💡 **ヒント:** strategyやreview_commentセルをダブルクリックすると、編集できます")
+    
+    editable_columns = ['strategy', 'review_comment']
+    disabled_columns = [col for col in display_losses.columns if col not in editable_columns]
+    
+    # 保存後はdata_versionが変わり、キーが新しくなるため編集記録もリセットされる
+    editor_key = f"losing_trades_editor_{st.session_state.data_version}"
+    edited_losses = st.data_editor(
+        display_losses,
+        use_container_width=True,
+        hide_index=True,
+        height=500,
+        disabled=disabled_columns,
+        column_config={
+            'strategy': st.column_config.SelectboxColumn(
+                'strategy',
+                help='手法を選択できます',
+                options=all_strategies,
+                required=False
+            ),
+            'review_comment': st.column_config.TextColumn(
+                'review_comment',
+                help='ダブルクリックして編集できます',
+                max_chars=500,
+                width='large'
+            )
+        },
+        key=editor_key
+    )
+    
+    # 変更があれば保存ボタンを表示（全セル比較ではなくエディターの編集記録で判定）
+    if _has_pending_edits(editor_key):
+        st.warning("⚠️ 変更が保存されていません")
+        if st.button("💾 変更を保存", type="primary", key="save_losing_review_changes"):
+            data_manager = get_data_manager()
+            if data_manager:
+                with st.spinner('保存中...'):
+                    try:
+                        # 変更されたセルだけを抽出し、1回のリクエストでまとめて更新
+                        updates = _collect_updates(edited_losses, display_losses, ['review_comment', 'strategy'])
+                        # セルを編集して元に戻した場合などは、編集記録があっても保存する変更はない
+                        changes_count = data_manager.update_cells_bulk(updates) if updates else 0
+                        
+                        if not updates:
+                            st.info("変更はありません")
+                        elif changes_count > 0:
+                            # トーストは再実行後も表示されるため、待機せずにすぐ再実行する
+                            st.toast(f"✅ {changes_count}件の変更を保存しました！")
+                            invalidate_data()
+                            st.rerun()
+                        else:
+                            st.error("❌ 変更の保存に失敗しました")
+                    except Exception as e:
+                        st.error(f"❌ エラーが発生しました: {e}")
+            else:
+                st.error("❌ データマネージャーの初期化に失敗しました")
+
+
 def review_page():
     """振り返りページ"""
     st.title("🔄 振り返り機能")
@@ -1275,9 +1069,8 @@ def review_page():
         st.warning("データがありません。")
         return
     
-    analyzer = TradeAnalyzer(df)
-    
     # タブで機能を分割
+    # st.tabsは全タブの中身を毎回評価するため、集計はキャッシュ済みヘルパー経由で再計算を避ける
     tab1, tab2, tab3 = st.tabs([
         "パターン分析", "振り返りコメント編集", "負けトレード分析"
     ])
@@ -1287,7 +1080,7 @@ def review_page():
         
         # 連続損失分析
         st.write("**🔴 連続損失分析**")
-        max_consecutive, max_loss, streaks = analyzer.get_consecutive_losses()
+        max_consecutive, max_loss, streaks = _consecutive_losses(df)
         
         col1, col2 = st.columns(2)
         with col1:
@@ -1299,17 +1092,13 @@ def review_page():
             st.write("**連続損失の履歴（3回以上）:**")
             for i, streak in enumerate(streaks, 1):
                 with st.expander(f"連敗#{i}: {streak['count']}回連続 (損失: ¥{streak['total_loss']:,.0f})"):
-                    streak_df = pd.DataFrame(streak['trades'])
-                    if not streak_df.empty:
-                        display_cols = ['trade_id', 'date', 'currency_pair', 'strategy', 'net_profit_loss_jpy']
-                        available_cols = [col for col in display_cols if col in streak_df.columns]
-                        st.dataframe(streak_df[available_cols], use_container_width=True, hide_index=True)
+                    st.dataframe(streak['trades'], use_container_width=True, hide_index=True)
         
         st.divider()
         
         # 最大損失トレード
         st.write("**💸 損失額トップ5**")
-        top_losses = analyzer.get_top_losses(5)
+        top_losses = _top_losses(df, 5)
         
         if not top_losses.empty:
             display_cols = ['trade_id', 'date', 'currency_pair', 'type', 'strategy', 
@@ -1321,7 +1110,7 @@ def review_page():
         
         # 時間帯別分析
         st.write("**🕐 時間帯別パフォーマンス**")
-        session_analysis = analyzer.analyze_by_market_session()
+        session_analysis = _by_market_session(df)
         
         if not session_analysis.empty:
             fig = go.Figure()
@@ -1340,12 +1129,12 @@ def review_page():
                 height=400
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             st.dataframe(session_analysis, use_container_width=True)
         
         # 曜日別分析
         st.write("**📅 曜日別パフォーマンス**")
-        dow_analysis = analyzer.analyze_by_day_of_week()
+        dow_analysis = _by_day_of_week(df)
         
         if not dow_analysis.empty:
             fig = go.Figure()
@@ -1365,7 +1154,7 @@ def review_page():
                 yaxis_range=[0, 100]
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             st.dataframe(dow_analysis, use_container_width=True)
     
     with tab2:
@@ -1374,7 +1163,7 @@ def review_page():
         st.info("各トレードに対して振り返りコメントを追加・編集できます。反省点や気づき、市場の状況などを記録しましょう。")
         
         # トレード選択
-        trade_ids = sorted(df['trade_id'].unique(), reverse=True)
+        trade_ids = sorted(df['trade_id'].dropna().unique(), reverse=True)
         selected_trade_id = st.selectbox("トレードを選択", trade_ids)
         
         if selected_trade_id:
@@ -1386,7 +1175,7 @@ def review_page():
             with col1:
                 st.write(f"**取引番号:** {trade_row['trade_id']}")
                 # 日付を文字列形式で表示
-                trade_date = pd.to_datetime(trade_row['date']).strftime('%Y-%m-%d') if pd.notna(trade_row['date']) else 'N/A'
+                trade_date = trade_row['_date_str'] if pd.notna(trade_row.get('_date_str')) else 'N/A'
                 st.write(f"**日付:** {trade_date}")
                 st.write(f"**通貨ペア:** {trade_row['currency_pair']}")
                 st.write(f"**タイプ:** {trade_row['type']}")
@@ -1419,11 +1208,9 @@ def review_page():
                         try:
                             success = data_manager.update_review_comment(int(selected_trade_id), new_comment)
                             if success:
-                                st.success("✅ コメントを保存しました！")
-                                # データを再読み込み
-                                st.cache_resource.clear()
-                                import time
-                                time.sleep(1)  # Google Sheets APIの反映を待つ
+                                # トーストは再実行後も表示されるため、待機せずにすぐ再実行する
+                                st.toast("✅ コメントを保存しました！")
+                                invalidate_data()
                                 st.rerun()
                             else:
                                 st.error("❌ コメントの保存に失敗しました")
@@ -1438,8 +1225,11 @@ def review_page():
         
         st.info("負けトレードを分析して、共通点や改善点を見つけましょう。")
         
-        # 負けトレードのみ抽出
-        losing_trades = df[df['net_profit_loss_jpy'] < 0].copy()
+        # 負けトレードのみ抽出（読み込み時に計算済みのフラグを使用。参照のみなのでコピーしない）
+        if 'is_loss' in df.columns:
+            losing_trades = df[df['is_loss']]
+        else:
+            losing_trades = df[df['net_profit_loss_jpy'] < 0]
         
         if not losing_trades.empty:
             st.write(f"**負けトレード数:** {len(losing_trades)}件")
@@ -1467,44 +1257,24 @@ def review_page():
             
             with col1:
                 # 手法の選択肢: トレード履歴 + 保存済みテンプレートをマージ（NaN/None除外）
-                df_strategies = []
-                if 'strategy' in df.columns:
-                    df_strategies = df['strategy'].dropna().unique().tolist()
-
-                if not st.session_state.get('strategy_storage'):
-                    try:
-                        st.session_state.strategy_storage = StrategyStorage()
-                    except Exception:
-                        st.session_state.strategy_storage = None
-
-                storage_strategies = []
-                try:
-                    if st.session_state.get('strategy_storage'):
-                        storage_strategies = list(st.session_state.strategy_storage.get_all_strategies().keys())
-                except Exception:
-                    storage_strategies = []
-
-                combined = list(df_strategies) + list(storage_strategies)
-                valid_strategies = [str(s).strip() for s in combined if pd.notna(s) and str(s).strip() and str(s).strip().lower() not in ['nan', 'none', '']]
-                strategies = ['すべて'] + sorted(list(set(valid_strategies))) if valid_strategies else ['すべて']
+                strategies = ['すべて'] + _strategy_choices(df)
                 selected_strategy = st.selectbox("手法でフィルター", strategies, key="losing_strategy")
             
             with col2:
                 # 通貨ペアの選択肢（NaNや空文字列を除外）
-                valid_pairs = losing_trades['currency_pair'].dropna().unique()
-                valid_pairs = [str(p).strip() for p in valid_pairs if p and str(p).strip() and str(p).lower() != 'nan']
+                valid_pairs = losing_trades['currency_pair'].dropna().astype(str).unique()
                 pairs = ['すべて'] + sorted(valid_pairs)
                 selected_pair = st.selectbox("通貨ペアでフィルター", pairs, key="losing_pair")
             
             # フィルター適用
-            filtered_losses = losing_trades.copy()
+            filtered_losses = losing_trades
             if selected_strategy != 'すべて':
                 filtered_losses = filtered_losses[
-                    filtered_losses['strategy'].astype(str).str.strip() == str(selected_strategy).strip()
+                    filtered_losses['strategy'] == selected_strategy
                 ]
             if selected_pair != 'すべて':
                 filtered_losses = filtered_losses[
-                    filtered_losses['currency_pair'].astype(str).str.strip() == str(selected_pair).strip()
+                    filtered_losses['currency_pair'] == selected_pair
                 ]
             
             st.write(f"**フィルター結果:** {len(filtered_losses)}件")
@@ -1514,104 +1284,21 @@ def review_page():
                           'net_profit_loss_jpy', 'pips', 'review_comment']
             available_cols = [col for col in display_cols if col in filtered_losses.columns]
             
-            # 表示用のコピーを作成
-            display_losses = filtered_losses[available_cols].copy()
-            
-            # 日付を文字列形式に変換
-            if 'date' in display_losses.columns:
-                display_losses['date'] = pd.to_datetime(display_losses['date']).dt.strftime('%Y-%m-%d')
+            # 表示用DataFrameを作成（日付は読み込み時に生成済みの文字列を使用）
+            display_losses = TradeDataManager.build_display_frame(filtered_losses, available_cols)
             
             # ソート
             display_losses = display_losses.sort_values('net_profit_loss_jpy')
             
             # 手法の選択肢を取得（編集用）: トレード履歴 + 保存済みテンプレートをマージ
-            df_strategies = []
-            if 'strategy' in df.columns:
-                df_strategies = df['strategy'].dropna().unique().tolist()
-
-            if not st.session_state.get('strategy_storage'):
-                try:
-                    st.session_state.strategy_storage = StrategyStorage()
-                except Exception:
-                    st.session_state.strategy_storage = None
-
-            storage_strategies = []
-            try:
-                if st.session_state.get('strategy_storage'):
-                    storage_dict = st.session_state.strategy_storage.get_all_strategies()
-                    storage_strategies = list(storage_dict.keys())
-            except Exception:
-                storage_strategies = []
-
-            combined = list(df_strategies) + list(storage_strategies)
-            all_strategies = [str(s).strip() for s in combined if pd.notna(s) and str(s).strip() and str(s).strip().lower() not in ['nan', 'none', '']]
-            all_strategies = sorted(list(set(all_strategies)))
-            
-            # 編集可能なデータエディター
-            st.write("💡 **ヒント:** strategyやreview_commentセルをダブルクリックすると、編集できます")
-            
-            editable_columns = ['strategy', 'review_comment']
-            disabled_columns = [col for col in display_losses.columns if col not in editable_columns]
-            
-            edited_losses = st.data_editor(
-                display_losses,
-                use_container_width=True,
-                hide_index=True,
-                height=500,
-                disabled=disabled_columns,
-                column_config={
-                    'strategy': st.column_config.SelectboxColumn(
-                        'strategy',
-                        help='手法を選択できます',
-                        options=all_strategies,
-                        required=False
-                    ),
-                    'review_comment': st.column_config.TextColumn(
-                        'review_comment',
-                        help='ダブルクリックして編集できます',
-                        max_chars=500,
-                        width='large'
-                    )
-                },
-                key='losing_trades_editor'
-            )
+            all_strategies = _strategy_choices(df)
             
-            # 変更があれば保存ボタンを表示
-            if not edited_losses.equals(display_losses):
-                st.warning("⚠️ 変更が保存されていません")
-                if st.button("💾 変更を保存", type="primary", key="save_losing_review_changes"):
-                    data_manager = get_data_manager()
-                    if data_manager:
-                        with st.spinner('保存中...'):
-                            try:
-                                changes_count = 0
-                                for idx in edited_losses.index:
-                                    # review_commentの変更をチェック
-                                    if edited_losses.loc[idx, 'review_comment'] != display_losses.loc[idx, 'review_comment']:
-                                        trade_id = int(edited_losses.loc[idx, 'trade_id'])
-                                        new_comment = edited_losses.loc[idx, 'review_comment']
-                                        if data_manager.update_review_comment(trade_id, new_comment):
-                                            changes_count += 1
-                                    
-                                    # strategyの変更をチェック
-                                    if edited_losses.loc[idx, 'strategy'] != display_losses.loc[idx, 'strategy']:
-                                        trade_id = int(edited_losses.loc[idx, 'trade_id'])
-                                        new_strategy = edited_losses.loc[idx, 'strategy']
-                                        if data_manager.update_strategy(trade_id, new_strategy):
-                                            changes_count += 1
-                                
-                                if changes_count > 0:
-                                    st.success(f"✅ {changes_count}件の変更を保存しました！")
-                                    st.cache_resource.clear()
-                                    import time
-                                    time.sleep(1)
-                                    st.rerun()
-                                else:
-                                    st.error("❌ 変更の保存に失敗しました")
-                            except Exception as e:
-                                st.error(f"❌ エラーが発生しました: {e}")
-                    else:
-                        st.error("❌ データマネージャーの初期化に失敗しました")
+            # 既存にない手法も選べるよう、カテゴリ型からobject型に戻す
+            if 'strategy' in display_losses.columns:
+                display_losses['strategy'] = display_losses['strategy'].astype(object)
+            
+            # 編集可能なデータエディター（フラグメント化して編集時はこの部分のみ再実行）
+            _losing_trades_editor(display_losses, all_strategies)
             
             # 共通点の分析
             st.divider()
@@ -1621,33 +1308,52 @@ def review_page():
             
             with col1:
                 # 手法別の負け率
-                strategy_losses = filtered_losses.groupby('strategy').size()
-                fig = px.pie(
-                    values=strategy_losses.values,
-                    names=strategy_losses.index,
-                    title='手法別負けトレード割合'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                fig = _loss_share_pie(filtered_losses, TradeDataManager.content_hash(df),
+                                      selected_strategy, selected_pair, 'strategy', '手法別負けトレード割合')
+                st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             
             with col2:
                 # 通貨ペア別の負け率
-                pair_losses = filtered_losses.groupby('currency_pair').size()
-                fig = px.pie(
-                    values=pair_losses.values,
-                    names=pair_losses.index,
-                    title='通貨ペア別負けトレード割合'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                fig = _loss_share_pie(filtered_losses, TradeDataManager.content_hash(df),
+                                      selected_strategy, selected_pair, 'currency_pair', '通貨ペア別負けトレード割合')
+                st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         else:
             st.success("負けトレードがありません！すばらしい成績です！")
 
 
+def _template_markdown(template: dict) -> str:
+    """手法テンプレートの内容を1つのMarkdownにまとめる（空の項目は省略）"""
+    sections = [
+        f"**タイプ:** {template['type']}",
+        f"**推奨時間足:** {template['time_frame']}",
+    ]
+    if template['suitable_pairs']:
+        sections.append(f"**通貨ペア:** {', '.join(template['suitable_pairs'])}")
+    if template['entry_conditions']:
+        # 改行を保つため各行末に半角スペース2つ（Markdownの強制改行）を付ける
+        quoted = "\n".join(f"> {line}  " for line in template['entry_conditions'].splitlines())
+        sections.append(f"**エントリー条件:**\n\n{quoted}")
+    if template['entry_indicators']:
+        sections.append(f"**インジケーター:** {', '.join(template['entry_indicators'])}")
+    if template['take_profit']:
+        sections.append(f"**利益確定:** {template['take_profit']}")
+    if template['stop_loss']:
+        sections.append(f"**損切り:** {template['stop_loss']}")
+    if template['position_size']:
+        sections.append(f"**ポジションサイズ:** {template['position_size']}")
+    return "\n\n".join(sections)
+
+
 def strategy_management_page():
     """手法管理ページ"""
     st.title("📚 手法管理")
     
     st.info("トレード手法を記録・管理し、各手法のルールを明確化することで、一貫性のあるトレードを実現します。")
     
+    # 手法テンプレートはセッション開始時に保存済みのJSONから復元
+    if 'strategy_templates' not in st.session_state:
+        st.session_state.strategy_templates = get_template_storage().get_all_templates()
+    
     # タブで機能を分割
     tab1, tab2, tab3 = st.tabs([
         "手法一覧", "手法登録・編集", "手法パフォーマンス"
@@ -1660,8 +1366,7 @@ def strategy_management_page():
         if df is not None and not df.empty:
             # TradeAnalyzerを使用して手法を取得
             try:
-                analyzer = TradeAnalyzer(df)
-                strategy_stats = analyzer.analyze_by_strategy()
+                strategy_stats = _by_strategy(df)
                 # デバッグ情報
                 # st.write(f"Debug: strategy_stats shape: {strategy_stats.shape}")
                 # st.write(f"Debug: strategy_stats index: {strategy_stats.index.tolist()}")
@@ -1673,28 +1378,8 @@ def strategy_management_page():
             if not strategy_stats.empty:
                 strategies = sorted(strategy_stats.index.tolist())
 
-            # フォールバック/補完: analyzerで取得した手法にストレージの手法をマージ
-            df_strategies = []
-            if 'strategy' in df.columns:
-                df_strategies = df['strategy'].dropna().unique().tolist()
-
-            if not st.session_state.get('strategy_storage'):
-                try:
-                    st.session_state.strategy_storage = StrategyStorage()
-                except Exception:
-                    st.session_state.strategy_storage = None
-
-            storage_strategies = []
-            try:
-                if st.session_state.get('strategy_storage'):
-                    storage_strategies = list(st.session_state.strategy_storage.get_all_strategies().keys())
-            except Exception:
-                storage_strategies = []
-
-            # combine: strategy_stats (優先) + df + storage
-            combined = list(strategies) + list(df_strategies) + list(storage_strategies)
-            strategies = [str(s).strip() for s in combined if pd.notna(s) and str(s).strip() and str(s).strip().lower() not in ['nan', 'none', '']]
-            strategies = sorted(list(dict.fromkeys(strategies)))
+            # フォールバック/補完: analyzerで取得した手法にトレード履歴・ストレージの手法をマージ
+            strategies = _clean_strategy_names(list(strategies) + _strategy_choices(df))
             
             if strategies:
                 st.write(f"**登録済み手法数:** {len(strategies)}件")
@@ -1766,13 +1451,9 @@ def strategy_management_page():
                         st.divider()
                         st.write(f"**この手法のトレード一覧（全{len(strategy_trades)}件）**")
                         
-                        all_strategy_trades = strategy_trades.sort_values('date', ascending=False)
-                        display_cols = ['trade_id', 'date', 'currency_pair', 'type', 'pips', 'net_profit_loss_jpy', 'review_comment']
-                        available_cols = [col for col in display_cols if col in all_strategy_trades.columns]
-                        
-                        display_df = all_strategy_trades[available_cols].copy()
-                        if 'date' in display_df.columns:
-                            display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
+                        # 同じデータ版数・手法では表示用DataFrameを作り直さない
+                        display_df = strategy_trades_display(df, TradeDataManager.content_hash(df), selected_strategy)
+                        strategy_editor_key = f"strategy_trades_editor_{st.session_state.data_version}"
                         
                         # 編集可能なデータエディター
                         st.write("💡 **ヒント:** review_commentセルをダブルクリックすると、編集できます")
@@ -1794,31 +1475,32 @@ def strategy_management_page():
                                     width='large'
                                 )
                             },
-                            key='strategy_trades_editor'
+                            key=strategy_editor_key
                         )
                         
-                        # 変更があれば保存ボタンを表示
-                        if not edited_strategy_df.equals(display_df):
+                        # 変更があれば保存ボタンを表示（全セルの比較はせず編集記録の有無だけを見る）
+                        if _has_pending_edits(strategy_editor_key):
                             st.warning("⚠️ 変更が保存されていません")
                             if st.button("💾 変更を保存", type="primary", key="save_strategy_review_changes"):
                                 data_manager = get_data_manager()
                                 if data_manager:
                                     with st.spinner('保存中...'):
                                         try:
+                                            # review_commentの変更を列単位の比較で抽出し、一括で書き込む
+                                            updates = _collect_updates(edited_strategy_df, display_df, ['review_comment'])
+                                            # セルを編集して元に戻した場合などは、編集記録があっても保存する変更はない
                                             changes_count = 0
-                                            for idx in edited_strategy_df.index:
-                                                # review_commentの変更をチェック
-                                                if edited_strategy_df.loc[idx, 'review_comment'] != display_df.loc[idx, 'review_comment']:
-                                                    trade_id = int(edited_strategy_df.loc[idx, 'trade_id'])
-                                                    new_comment = edited_strategy_df.loc[idx, 'review_comment']
-                                                    if data_manager.update_review_comment(trade_id, new_comment):
-                                                        changes_count += 1
+                                            if updates:
+                                                changes_count = data_manager.bulk_update_review_comments(
+                                                    [(trade_id, comment) for trade_id, _, comment in updates]
+                                                )
                                             
-                                            if changes_count > 0:
-                                                st.success(f"✅ {changes_count}件の変更を保存しました！")
-                                                st.cache_resource.clear()
-                                                import time
-                                                time.sleep(1)
+                                            if not updates:
+                                                st.info("変更はありません")
+                                            elif changes_count > 0:
+                                                # トーストは再実行後も表示されるため、待機せずにすぐ再実行する
+                                                st.toast(f"✅ {changes_count}件の変更を保存しました！")
+                                                invalidate_data()
                                                 st.rerun()
                                             else:
                                                 st.error("❌ 変更の保存に失敗しました")
@@ -1943,10 +1625,7 @@ def strategy_management_page():
                 if not strategy_name:
                     st.error("❌ 手法名は必須です")
                 else:
-                    # セッションステートに保存
-                    if 'strategy_templates' not in st.session_state:
-                        st.session_state.strategy_templates = {}
-                    
+                    # セッションステートに保存（ファイルへはTemplateStorageがまとめて書き込む）
                     st.session_state.strategy_templates[strategy_name] = {
                         'name': strategy_name,
                         'type': strategy_type,
@@ -1963,46 +1642,26 @@ def strategy_management_page():
                         'notes': notes
                     }
                     
+                    get_template_storage().save_template(strategy_name, st.session_state.strategy_templates[strategy_name])
+                    
                     st.success(f"✅ 手法テンプレート「{strategy_name}」を保存しました！")
                     st.info("💡 トレードログでこの手法名を使用してください。")
         
         # 保存済みテンプレートの表示
-        if 'strategy_templates' in st.session_state and st.session_state.strategy_templates:
+        if st.session_state.strategy_templates:
             st.divider()
             st.subheader("📚 保存済みテンプレート")
             
             for name, template in st.session_state.strategy_templates.items():
                 with st.expander(f"📖 {name}"):
-                    st.write(f"**タイプ:** {template['type']}")
-                    st.write(f"**推奨時間足:** {template['time_frame']}")
-                    if template['suitable_pairs']:
-                        st.write(f"**通貨ペア:** {', '.join(template['suitable_pairs'])}")
-                    
-                    if template['entry_conditions']:
-                        st.write("**エントリー条件:**")
-                        st.info(template['entry_conditions'])
-                    
-                    if template['entry_indicators']:
-                        st.write(f"**インジケーター:** {', '.join(template['entry_indicators'])}")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if template['take_profit']:
-                            st.write(f"**利益確定:** {template['take_profit']}")
-                    with col2:
-                        if template['stop_loss']:
-                            st.write(f"**損切り:** {template['stop_loss']}")
-                    
-                    if template['position_size']:
-                        st.write(f"**ポジションサイズ:** {template['position_size']}")
+                    st.markdown(_template_markdown(template))
     
     with tab3:
         st.subheader("📊 手法別パフォーマンス比較")
         
         df = load_data()
         if df is not None and not df.empty:
-            analyzer = TradeAnalyzer(df)
-            strategy_stats = analyzer.analyze_by_strategy()
+            strategy_stats = _by_strategy(df)
             
             if not strategy_stats.empty:
                 # グラフで比較
@@ -2013,12 +1672,11 @@ def strategy_management_page():
                         strategy_stats.reset_index(),
                         x='strategy',
                         y='合計損益',
-                        title='手法別累積損益',
-                        color='合計損益',
-                        color_continuous_scale=['red', 'yellow', 'green']
+                        title='手法別累積損益'
                     )
+                    fig.update_traces(marker_color=profit_bar_colors(strategy_stats['合計損益']))
                     fig.update_layout(height=400)
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
                 
                 with col2:
                     fig = px.scatter(
@@ -2029,11 +1687,12 @@ def strategy_management_page():
                         text='strategy',
                         title='手法別: 勝率 vs 平均損益',
                         color='合計損益',
-                        color_continuous_scale='RdYlGn'
+                        color_continuous_scale='RdYlGn',
+                        render_mode='webgl'
                     )
                     fig.update_traces(textposition='top center')
                     fig.update_layout(height=400)
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
                 
                 # ランキング
                 st.divider()
@@ -2042,24 +1701,27 @@ def strategy_management_page():
                 
                 with col1:
                     st.write("**🏆 累積損益ランキング**")
-                    top_profit = strategy_stats.nlargest(5, '合計損益')[['合計損益', '勝率']]
-                    for idx, (strategy, row) in enumerate(top_profit.iterrows(), 1):
-                        emoji = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else "📊"
-                        st.write(f"{emoji} {strategy}: ¥{row['合計損益']:,.0f} (勝率{row['勝率']:.1f}%)")
+                    top_profit = strategy_stats.nlargest(5, '合計損益')
+                    st.markdown(ranking_markdown(
+                        f"{strategy}: ¥{profit:,.0f} (勝率{win_rate:.1f}%)"
+                        for strategy, profit, win_rate in zip(top_profit.index, top_profit['合計損益'], top_profit['勝率'])
+                    ))
                 
                 with col2:
                     st.write("**🎯 勝率ランキング**")
-                    top_winrate = strategy_stats.nlargest(5, '勝率')[['勝率', '取引数']]
-                    for idx, (strategy, row) in enumerate(top_winrate.iterrows(), 1):
-                        emoji = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else "📊"
-                        st.write(f"{emoji} {strategy}: {row['勝率']:.1f}% ({row['取引数']:.0f}回)")
+                    top_winrate = strategy_stats.nlargest(5, '勝率')
+                    st.markdown(ranking_markdown(
+                        f"{strategy}: {win_rate:.1f}% ({count:.0f}回)"
+                        for strategy, win_rate, count in zip(top_winrate.index, top_winrate['勝率'], top_winrate['取引数'])
+                    ))
                 
                 with col3:
                     st.write("**💰 平均損益ランキング**")
-                    top_avg = strategy_stats.nlargest(5, '平均損益')[['平均損益', '取引数']]
-                    for idx, (strategy, row) in enumerate(top_avg.iterrows(), 1):
-                        emoji = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else "📊"
-                        st.write(f"{emoji} {strategy}: ¥{row['平均損益']:,.0f} ({row['取引数']:.0f}回)")
+                    top_avg = strategy_stats.nlargest(5, '平均損益')
+                    st.markdown(ranking_markdown(
+                        f"{strategy}: ¥{avg:,.0f} ({count:.0f}回)"
+                        for strategy, avg, count in zip(top_avg.index, top_avg['平均損益'], top_avg['取引数'])
+                    ))
                 
                 # 推奨とワーニング
                 st.divider()
@@ -2102,7 +1764,7 @@ def main():
 
     pages = ["📊 ダッシュボード", "🔍 詳細分析", "📋 トレードログ", "📚 手法管理", "🧮 ポジション計算機", "🔄 振り返り"]
 
-    # ヘッダー（containerをCSSで固定し、その中にナビを配置）
+    # ヘッダー（containerをCSSのposition: stickyで固定し、その中にナビを配置）
     header = st.container()
     with header:
         st.markdown('<div class="app-header-marker" id="header-marker"></div>', unsafe_allow_html=True)
@@ -2140,63 +1802,12 @@ def main():
                 st.markdown('<div class="header-refresh-btn">', unsafe_allow_html=True)
                 if st.button("🔄 更新", key="refresh_data", use_container_width=True):
                     st.cache_resource.clear()
+                    invalidate_data()
                     if 'strategy_manager' in st.session_state:
                         st.session_state.strategy_manager = None
                     st.rerun()
                 st.markdown('</div>', unsafe_allow_html=True)
 
-    # JavaScriptでヘッダーにスクロールエフェクトを追加
-    st.markdown("""
-    <script>
-        (function initStickyHeader() {
-            const marker = document.getElementById('header-marker');
-            if (!marker) {
-                setTimeout(initStickyHeader, 100);
-                return;
-            }
-
-            // マーカーから親コンテナを探す
-            let container = marker;
-            let attempts = 0;
-            while (container && attempts < 20) {
-                const isVertical = container.getAttribute && container.getAttribute('data-testid') === 'stVerticalBlock';
-                const hasBrand = container.querySelector && container.querySelector('.header-brand');
-                if (isVertical && hasBrand) {
-                    break;
-                }
-                container = container.parentElement;
-                attempts++;
-            }
-
-            if (!container) {
-                setTimeout(initStickyHeader, 100);
-                return;
-            }
-
-            // スティッキーヘッダークラスを追加
-            container.classList.add('fixed-header-container');
-            console.log('✓ スティッキーヘッダーを初期化しました');
-
-            // スクロールイベントでスタイル切り替え
-            let lastScroll = 0;
-            function handleScroll() {
-                const currentScroll = window.pageYOffset || document.documentElement.scrollTop;
-                
-                if (currentScroll > 10) {
-                    container.classList.add('scrolled');
-                } else {
-                    container.classList.remove('scrolled');
-                }
-                
-                lastScroll = currentScroll;
-            }
-
-            window.addEventListener('scroll', handleScroll, { passive: true });
-            handleScroll(); // 初回実行
-        })();
-    </script>
-    """, unsafe_allow_html=True)
-    
     # コンテンツエリア
     st.markdown('<div class="content-wrapper">', unsafe_allow_html=True)
     
@@ -2211,7 +1822,7 @@ def main():
     elif page_name == "トレードログ":
         trade_log_page()
     elif page_name == "手法管理":
-        strategy_management_page_new(load_data, get_strategy_manager)
+        strategy_management_page_new(load_data, get_strategy_manager, invalidate_data)
     elif page_name == "ポジション計算機":
         position_calculator_page()
     elif page_name == "振り返り":
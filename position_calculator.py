@@ -8,6 +8,8 @@
 
 import math
 
+import numpy as np
+
 
 def to_float(s, default=None):
     try:
@@ -54,6 +56,46 @@ def calc_take_profit_price(entry_price, stop_price, rr):
     return tp, sl_dist, tp_dist, direction
 
 
+def calc_by_pips_vec(balance, risk_pct, pip_diff, pip_value_per_lot, lot_unit=100000):
+    """
+    calc_by_pips の配列版（リスク割合・損切り幅などの組み合わせをまとめて計算）
+    各引数はスカラーまたは配列で、NumPyのブロードキャスト規則に従って計算する。
+    戻り値のキーは calc_by_pips と同じ（値は配列）。
+    """
+    pip_diff = np.asarray(pip_diff, dtype=float)
+    pip_value_per_lot = np.asarray(pip_value_per_lot, dtype=float)
+    if np.any(pip_diff <= 0) or np.any(pip_value_per_lot <= 0):
+        raise ValueError("pip差またはpip価値は正の数にしてください")
+    risk_amount = np.asarray(balance, dtype=float) * (np.asarray(risk_pct, dtype=float) / 100.0)
+    lots = risk_amount / (pip_diff * pip_value_per_lot)
+    units = lots * lot_unit
+    return {
+        "risk_amount": risk_amount,
+        "pip_diff": pip_diff,
+        "lots": lots,
+        "units": units,
+    }
+
+
+def calc_take_profit_price_vec(entry_price, stop_price, rr):
+    """
+    calc_take_profit_price の配列版（ロング/ショートは要素ごとに分岐なしで判別）
+    戻り値: (利確価格, 損切り幅, 利確幅, 方向) の配列。方向は 1=ロング, -1=ショート
+    """
+    entry_price = np.asarray(entry_price, dtype=float)
+    stop_price = np.asarray(stop_price, dtype=float)
+    rr = np.asarray(rr, dtype=float)
+    if np.any(rr <= 0):
+        raise ValueError("RRは正の数で入力してください")
+    direction = np.sign(entry_price - stop_price)
+    if np.any(direction == 0):
+        raise ValueError("Entry と Stop は異なる価格である必要があります")
+    sl_dist = np.abs(entry_price - stop_price)
+    tp_dist = sl_dist * rr
+    tp = entry_price + direction * tp_dist
+    return tp, sl_dist, tp_dist, direction
+
+
 def print_results(res, entry_price=None, stop_price=None, rr=None, pip_value_per_lot=None, lot_unit=100000):
     print('\n=== 計算結果 ===')
     print(f"リスク金額: {res['risk_amount']:.2f}")
@@ -71,10 +71,10 @@ def setup_spreadsheet():
             "振り返りコメント"
         ]
         
-        # 既存のデータを確認
-        existing_data = sheet.get_all_values()
+        # 既存のデータを確認（シート全体は読まず、2行目に値があるかだけを見る）
+        existing_data = sheet.row_values(2)
         
-        if existing_data and len(existing_data) > 1:
+        if existing_data:
             print("⚠️  警告: シートには既にデータが存在します")
             response = input("既存のヘッダー行を上書きしますか？ (y/n): ")
             
@@ -82,39 +82,75 @@ def setup_spreadsheet():
                 print("❌ キャンセルしました")
                 return False
         
-        # ヘッダー行を設定
-        print("📝 ヘッダー行を設定しています...")
-        sheet.update('A1:P1', [headers])
-        
-        # ヘッダー行のフォーマット
-        print("🎨 フォーマットを適用しています...")
-        sheet.format('A1:P1', {
-            "textFormat": {
-                "bold": True,
-                "fontSize": 11
+        # ヘッダー行の値・書式・列幅・固定を1回のbatch_updateでまとめて設定
+        print("📝 ヘッダー行とフォーマットを設定しています...")
+        header_range = {
+            "sheetId": sheet.id,
+            "startRowIndex": 0,
+            "endRowIndex": 1,
+            "startColumnIndex": 0,
+            "endColumnIndex": len(headers)
+        }
+        requests = [
+            # ヘッダー行の値
+            {
+                "updateCells": {
+                    "range": header_range,
+                    "rows": [{
+                        "values": [{"userEnteredValue": {"stringValue": header}} for header in headers]
+                    }],
+                    "fields": "userEnteredValue"
+                }
             },
-            "backgroundColor": {
-                "red": 0.2,
-                "green": 0.4,
-                "blue": 0.8
+            # ヘッダー行のフォーマット
+            {
+                "repeatCell": {
+                    "range": header_range,
+                    "cell": {
+                        "userEnteredFormat": {
+                            "textFormat": {
+                                "foregroundColor": {
+                                    "red": 1.0,
+                                    "green": 1.0,
+                                    "blue": 1.0
+                                },
+                                "bold": True,
+                                "fontSize": 11
+                            },
+                            "backgroundColor": {
+                                "red": 0.2,
+                                "green": 0.4,
+                                "blue": 0.8
+                            },
+                            "horizontalAlignment": "CENTER"
+                        }
+                    },
+                    "fields": "userEnteredFormat(textFormat,backgroundColor,horizontalAlignment)"
+                }
             },
-            "textFormat": {
-                "foregroundColor": {
-                    "red": 1.0,
-                    "green": 1.0,
-                    "blue": 1.0
-                },
-                "bold": True
+            # 列幅の調整
+            {
+                "autoResizeDimensions": {
+                    "dimensions": {
+                        "sheetId": sheet.id,
+                        "dimension": "COLUMNS",
+                        "startIndex": 0,
+                        "endIndex": len(headers)
+                    }
+                }
             },
-            "horizontalAlignment": "CENTER"
-        })
-        
-        # 列幅の調整
-        print("📏 列幅を調整しています...")
-        sheet.columns_auto_resize(0, 15)
-        
-        # 最初の行を固定
-        sheet.freeze(rows=1)
+            # 最初の行を固定
+            {
+                "updateSheetProperties": {
+                    "properties": {
+                        "sheetId": sheet.id,
+                        "gridProperties": {"frozenRowCount": 1}
+                    },
+                    "fields": "gridProperties.frozenRowCount"
+                }
+            }
+        ]
+        spreadsheet.batch_update({"requests": requests})
         
         print("\n✅ セットアップが完了しました！")
         print(f"\n📋 設定されたヘッダー:")
@@ -18,6 +18,9 @@ class Config:
     GOOGLE_SHEETS_CREDENTIALS_FILE = os.getenv('GOOGLE_SHEETS_CREDENTIALS_FILE', 'credentials.json')
     GOOGLE_SHEETS_SPREADSHEET_ID = os.getenv('GOOGLE_SHEETS_SPREADSHEET_ID', '')
     
+    # デバッグ出力（列全体を走査するunique()などの確認ログを出すか）
+    DEBUG_LOG = os.getenv('DEBUG_LOG', 'false').lower() == 'true'
+    
     @classmethod
     def validate(cls):
         """設定値の検証"""
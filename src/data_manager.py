@@ -1,10 +1,90 @@
 """トレードデータ管理モジュール"""
+import atexit
+import functools
+import threading
+import weakref
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import gspread
 from google.oauth2.service_account import Credentials
+from src.config import Config
+
+try:
+    from numba import njit
+except ImportError:
+    # numbaは任意依存（未インストール時はNumPyの累積最大値で計算する）
+    njit = None
+
+
+def _max_drawdown_kernel(cumulative: np.ndarray) -> float:
+    """累積損益の配列から最大ドローダウンを1パスで求める（NaNは無視）"""
+    peak = -np.inf
+    max_drawdown = 0.0
+    for value in cumulative:
+        if np.isnan(value):
+            continue
+        if value > peak:
+            peak = value
+        if peak - value > max_drawdown:
+            max_drawdown = peak - value
+    return max_drawdown
+
+
+def _loss_streaks_kernel(losses: np.ndarray, abs_pnl: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """負けフラグの配列を1パスで走査し、連敗区間の (開始位置, 長さ, 損失額の合計) を返す"""
+    n = len(losses)
+    starts = np.empty(n, dtype=np.int64)
+    lengths = np.empty(n, dtype=np.int64)
+    totals = np.empty(n, dtype=np.float64)
+    count = 0
+    run_length = 0
+    run_total = 0.0
+    for i in range(n):
+        if losses[i]:
+            run_length += 1
+            run_total += abs_pnl[i]
+        elif run_length > 0:
+            starts[count] = i - run_length
+            lengths[count] = run_length
+            totals[count] = run_total
+            count += 1
+            run_length = 0
+            run_total = 0.0
+    if run_length > 0:
+        starts[count] = n - run_length
+        lengths[count] = run_length
+        totals[count] = run_total
+        count += 1
+    return starts[:count], lengths[:count], totals[:count]
+
+
+# numbaが使える場合のみJITコンパイル（cache=Trueでコンパイル結果をディスクに保存）
+_max_drawdown_jit = njit(cache=True)(_max_drawdown_kernel) if njit is not None else None
+_loss_streaks_jit = njit(cache=True)(_loss_streaks_kernel) if njit is not None else None
+
+try:
+    import pyarrow  # noqa: F401
+    # 文字列列の整形（str.replace/strip/upper等）をArrowの文字列カーネルで行う
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    # pyarrowは任意依存（未インストール時はPython実装のStringDtypeを使う）
+    STRING_DTYPE = 'string'
+
+
+def _sheet_api(method):
+    """
+    TradeDataManagerのメソッドを、同じインスタンスのSheets API呼び出しと排他的に実行するデコレーター
+    
+    gspreadのクライアントはスレッドセーフではないため、画面のスレッドと
+    プルダウン更新のタイマースレッドが同時に使わないようにする
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._api_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class TradeDataManager:
@@ -30,6 +110,31 @@ class TradeDataManager:
         'review_comment': '振り返りコメント'
     }
     
+    # カテゴリ型で保持する列（値の種類が少なく、groupby・フィルターで頻繁に使う列）
+    CATEGORY_COLUMNS = ['currency_pair', 'type', 'strategy']
+    
+    # 表示用の日時書式（読み込み時に '_<列名>_str' 列として一度だけ文字列化しておく）
+    DISPLAY_DATETIME_FORMATS = {
+        'date': '%Y-%m-%d',
+        'start_time': '%Y-%m-%d %H:%M',
+        'end_time': '%Y-%m-%d %H:%M',
+    }
+    
+    # 表示書式 → NumPyのdatetime64単位（datetime_as_stringで書式化できるもの）
+    _NUMPY_DATETIME_UNITS = {
+        '%Y-%m-%d': 'D',
+        '%Y-%m-%d %H:%M': 'm',
+    }
+    
+    # 行番号キャッシュを検証付きで使う更新件数の上限（超える場合はシート全体を取得して行を探す）
+    ROW_INDEX_VERIFY_LIMIT = 200
+    
+    # アプリの画面で使用する列（load_dataのcolumnsに渡すと、これ以外の列はシートから取得しない）
+    REQUIRED_COLUMNS = [
+        'trade_id', 'currency_pair', 'type', 'lot', 'start_time', 'end_time', 'date',
+        'pips', 'holding_time_sec', 'net_profit_loss_jpy', 'strategy', 'review_comment'
+    ]
+    
     def __init__(self, credentials_file: str, spreadsheet_id: str, sheet_name: str = None):
         """
         Args:
@@ -53,18 +158,47 @@ class TradeDataManager:
             self.sheet = self.spreadsheet.sheet1
         
         self.df = None
+        # 直近に読み込んだヘッダー行（列の位置の解決に使う。シートの列構成が変わったら取り直す）
+        self._header_cache = None
+        # 直近に読み込んだ 取引番号 → 行番号 の対応（更新時の全件取得・線形探索を省く）
+        self._trade_id_row_index = None
+        # 直近にプルダウンへ設定した (列番号, 手法リスト)（同じ内容の再設定を省く）
+        self._applied_dropdown = None
+        # Sheets API呼び出しの排他制御（_sheet_apiで使う。メソッドから別のメソッドを呼べるようRLock）
+        self._api_lock = threading.RLock()
     
-    def load_data(self) -> pd.DataFrame:
-        """Google Spreadsheetからデータを読み込み、DataFrameとして返す"""
+    @_sheet_api
+    def load_data(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Google Spreadsheetからデータを読み込み、DataFrameとして返す
+        
+        Args:
+            columns: 取得する列（システム名）。Noneの場合は全列を取得
+        """
         try:
-            # ヘッダー行と全データを取得
-            headers = self.sheet.row_values(1)
+            if columns is not None:
+                df = self._fetch_columns(columns)
+                if df is None:
+                    return pd.DataFrame(columns=list(self.COLUMN_MAPPING.keys()))
+                return self._finalize_loaded(df)
+            
+            # ヘッダー行と全データを1回のリクエストで取得
+            all_values = self.sheet.get_all_values()
+            headers = all_values[0] if all_values else []
+            self._header_cache = headers
+            if self.COLUMN_MAPPING['trade_id'] in headers:
+                trade_id_col_idx = headers.index(self.COLUMN_MAPPING['trade_id'])
+                self._index_trade_rows(
+                    row[trade_id_col_idx] if trade_id_col_idx < len(row) else '' for row in all_values[1:]
+                )
             
             # 空の列名を除外し、重複を処理
             cleaned_headers = []
+            kept_cols = []
             seen = {}
             for i, header in enumerate(headers):
                 if header and header.strip():  # 空でない場合のみ
+                    kept_cols.append(i)
                     header = header.strip()
                     # 重複がある場合は番号を付ける
                     if header in seen:
@@ -78,9 +212,6 @@ class TradeDataManager:
             if not cleaned_headers:
                 return pd.DataFrame(columns=list(self.COLUMN_MAPPING.keys()))
             
-            # すべてのレコードを取得（expected_headersを使用）
-            all_values = self.sheet.get_all_values()
-            
             print(f"=== Google Sheets データ読み込み ===")
             print(f"全行数（ヘッダー含む）: {len(all_values)}")
             
@@ -88,40 +219,148 @@ class TradeDataManager:
                 # ヘッダーのみでデータがない場合
                 return pd.DataFrame(columns=list(self.COLUMN_MAPPING.keys()))
             
-            # DataFrameに変換（ヘッダー行をスキップ）
-            df = pd.DataFrame(all_values[1:], columns=cleaned_headers)
-            print(f"DataFrame作成後の行数: {len(df)}")
+            # ヘッダー行を除いてobject配列にし、元のリストはすぐに手放す（シート全体を二重に持たない）
+            # （get_all_valuesは行の長さを揃えて返す）
+            values = np.asarray(all_values[1:], dtype=object)
+            all_values = None
             
-            # 空の行を削除
-            df = df.replace('', np.nan)
-            df = df.dropna(how='all')
-            print(f"空行削除後の行数: {len(df)}")
+            # 列名が空の列を除き、空行の削除も配列上でまとめて行ってからDataFrameに変換
+            df = pd.DataFrame(self._drop_blank_rows(values[:, kept_cols]), columns=cleaned_headers)
+            print(f"DataFrame作成後の行数: {len(df)}")
             
             # 列名を英語（システム名）に変換
             reverse_mapping = {v: k for k, v in self.COLUMN_MAPPING.items()}
             df.rename(columns=reverse_mapping, inplace=True)
             
-            # 必要な列が存在しない場合は追加
-            for sys_name in self.COLUMN_MAPPING.keys():
-                if sys_name not in df.columns:
-                    df[sys_name] = ''
-            
-            # データ型の変換
-            df = self._convert_data_types(df)
-            
-            # 追加のデータクリーニング
-            df = self._clean_data(df)
-            
-            print(f"最終的なデータ行数: {len(df)}")
-            print(f"=== データ読み込み完了 ===\n")
-            
-            # キャッシュ
-            self.df = df
-            return df
+            return self._finalize_loaded(df)
             
         except Exception as e:
             raise Exception(f"データ読み込みエラー: {str(e)}")
     
+    def _column_ranges(self, headers: List[str], columns: List[str]) -> List[Tuple[str, str]]:
+        """ヘッダー行から、指定した列（システム名）のデータ範囲（例: 'C2:C'）を求める"""
+        stripped = [h.strip() for h in headers]
+        targets = []
+        for col in columns:
+            header = self.COLUMN_MAPPING.get(col, col)
+            if header in stripped:
+                letter = gspread.utils.rowcol_to_a1(1, stripped.index(header) + 1)[:-1]
+                targets.append((col, f'{letter}2:{letter}'))
+        return targets
+    
+    def _fetch_columns(self, columns: List[str]) -> Optional[pd.DataFrame]:
+        """
+        指定した列だけをシートから取得
+        
+        前回のヘッダー行から求めた列範囲とヘッダー行（1:1）を1回のbatch_getでまとめて取得する。
+        ヘッダー行が前回と異なる場合（初回や列の追加時）のみ、列範囲を求め直して再取得する。
+        
+        Args:
+            columns: 取得する列（システム名）
+        
+        Returns:
+            システム名を列名とするDataFrame。該当する列がない場合はNone
+        """
+        headers = self._header_cache or []
+        targets = self._column_ranges(headers, columns)
+        value_ranges = self.sheet.batch_get(['1:1'] + [rng for _, rng in targets])
+        fresh_headers = list(value_ranges[0][0]) if value_ranges[0] else []
+        
+        if fresh_headers != headers:
+            targets = self._column_ranges(fresh_headers, columns)
+            value_ranges = [None] + (self.sheet.batch_get([rng for _, rng in targets]) if targets else [])
+        self._header_cache = fresh_headers
+        value_ranges = value_ranges[1:]
+        
+        if not targets:
+            return None
+        
+        n_rows = max((len(vr) for vr in value_ranges), default=0)
+        
+        print(f"=== Google Sheets データ読み込み（{len(targets)}列のみ） ===")
+        print(f"データ行数: {n_rows}")
+        
+        # 列ごとの値を1つのobject配列に詰める（末尾の空セルは返ってこないので''のまま）
+        values = np.full((n_rows, len(targets)), '', dtype=object)
+        for j, vr in enumerate(value_ranges):
+            values[:len(vr), j] = [row[0] if row else '' for row in vr]
+        names = [col for col, _ in targets]
+        if 'trade_id' in names:
+            self._index_trade_rows(values[:, names.index('trade_id')])
+        return pd.DataFrame(self._drop_blank_rows(values), columns=names)
+    
+    @staticmethod
+    def _drop_blank_rows(values: np.ndarray) -> np.ndarray:
+        """セル値の2次元配列で、空文字を欠損値にし、全てのセルが空の行を除く（1回の比較で両方を求める）"""
+        blank = values == ''
+        values[blank] = np.nan
+        return values[~blank.all(axis=1)]
+    
+    def _index_trade_rows(self, trade_ids) -> None:
+        """データ行（2行目から）の取引番号から 取引番号 → 行番号 の対応を作り直す"""
+        index = {}
+        for row_idx, trade_id in enumerate(trade_ids, start=2):
+            index.setdefault(str(trade_id).strip(), row_idx)
+        self._trade_id_row_index = index
+    
+    def _cached_rows(self, trade_ids: List[str]) -> Optional[Dict[str, int]]:
+        """
+        キャッシュした行番号で更新対象の行を求める
+        
+        読み込み後に行が挿入・並べ替えされていないか、対象行の取引番号セルだけを
+        1回のbatch_getで読んで確かめる。
+        
+        Returns:
+            {取引番号: 行番号}。キャッシュがない・一致しない場合はNone
+        """
+        headers = self._header_cache
+        index = self._trade_id_row_index
+        if not headers or index is None or self.COLUMN_MAPPING['trade_id'] not in headers:
+            return None
+        if len(trade_ids) > self.ROW_INDEX_VERIFY_LIMIT:
+            return None
+        rows = {trade_id: index.get(trade_id) for trade_id in trade_ids}
+        if any(row is None for row in rows.values()):
+            return None
+        
+        col_idx = headers.index(self.COLUMN_MAPPING['trade_id']) + 1
+        cells = self.sheet.batch_get([gspread.utils.rowcol_to_a1(row, col_idx) for row in rows.values()])
+        for trade_id, vr in zip(rows, cells):
+            value = vr[0][0] if vr and vr[0] else ''
+            if str(value).strip() != trade_id:
+                return None
+        return rows
+    
+    def _finalize_loaded(self, df: pd.DataFrame) -> pd.DataFrame:
+        """取得したDataFrame（列名はシステム名）を分析用に整形してキャッシュする"""
+        # 空文字の欠損値化と空行の削除はDataFrame作成前に_drop_blank_rowsで済ませている
+        print(f"空行削除後の行数: {len(df)}")
+        
+        # 必要な列が存在しない場合は追加
+        for sys_name in self.COLUMN_MAPPING.keys():
+            if sys_name not in df.columns:
+                df[sys_name] = ''
+        
+        # データ型の変換
+        df = self._convert_data_types(df)
+        
+        # 追加のデータクリーニング
+        df = self._clean_data(df)
+        
+        # 負けトレードのフラグ（振り返りページで毎回比較し直さないよう読み込み時に一度だけ計算）
+        df['is_loss'] = df['net_profit_loss_jpy'] < 0
+        
+        # 分析用の派生列も読み込み時に一度だけ付与（TradeAnalyzerごとの再計算を省く）
+        if not df.empty:
+            TradeAnalyzer.add_derived_columns(df)
+        
+        print(f"最終的なデータ行数: {len(df)}")
+        print(f"=== データ読み込み完了 ===\n")
+        
+        # キャッシュ
+        self.df = df
+        return df
+    
     def _convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """データ型を適切な形式に変換"""
         if df.empty:
@@ -134,6 +373,13 @@ class TradeDataManager:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
         
+        # 取引番号は整数で保持（欠損行に備えてnullable整数型。小数が混じる場合はfloatのまま）
+        if 'trade_id' in df.columns:
+            try:
+                df['trade_id'] = df['trade_id'].astype('Int64')
+            except (TypeError, ValueError):
+                print("取引番号に整数以外の値があるため、float型のまま保持します")
+        
         # 純利益の符号確認（デバッグ用）
         if 'net_profit_loss_jpy' in df.columns:
             print(f"\n=== 純利益の統計情報 ===")
@@ -144,27 +390,97 @@ class TradeDataManager:
             print(f"負の値の数: {(df['net_profit_loss_jpy'] < 0).sum()}")
             print("========================\n")
         
-        # 日時型の変換
+        # 日時型の変換（同じ文字列が多いためcache=Trueでパース結果を再利用）
         datetime_cols = ['start_time', 'end_time', 'sync_time']
         for col in datetime_cols:
             if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
+                df[col] = pd.to_datetime(df[col], errors='coerce', cache=True)
         
         # 日付型の変換（datetimeのまま保持してソート・フィルタリングを可能に）
+        # 以降の処理ではこの列を再パースせずにそのまま使う
         if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
+            df['date'] = pd.to_datetime(df['date'], errors='coerce', cache=True)
         
-        # 文字列型の変換とクリーニング
-        string_cols = ['currency_pair', 'type', 'strategy', 'review_comment']
-        for col in string_cols:
+        # 表示用の日時文字列（描画時は列を参照するだけで済むように）
+        for col, fmt in self.DISPLAY_DATETIME_FORMATS.items():
             if col in df.columns:
-                df[col] = df[col].astype(str).replace('nan', '')
-                # 通貨ペアとタイプから不正な文字（#など）を除去
-                if col in ['currency_pair', 'type']:
-                    df[col] = df[col].str.replace('#', '', regex=False).str.strip()
+                df[f'_{col}_str'] = self.format_datetimes(df[col], fmt)
+        
+        # 振り返りコメントは欠損を空文字に（通貨ペア・タイプ・手法は_clean_dataでまとめて整形する）
+        if 'review_comment' in df.columns:
+            df['review_comment'] = df['review_comment'].astype(str).replace('nan', '')
         
         return df
     
+    @classmethod
+    def build_display_frame(cls, source: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        表示用DataFrameを列単位で組み立てる（全体のcopy()をしない）
+        
+        日時列のみ読み込み時に生成済みの文字列列に差し替え、それ以外の列は
+        sourceの列をそのまま参照する。
+        
+        Args:
+            source: 読み込み済みのDataFrame（'_<列名>_str' 列を含む）
+            columns: 表示する列名のリスト
+        
+        Returns:
+            表示用DataFrame
+        """
+        data = {}
+        for col in columns:
+            fmt = cls.DISPLAY_DATETIME_FORMATS.get(col)
+            if fmt is None:
+                data[col] = source[col]
+            elif f'_{col}_str' in source.columns:
+                data[col] = source[f'_{col}_str']
+            else:
+                data[col] = cls.format_datetimes(source[col], fmt)
+        return pd.DataFrame(data, index=source.index, copy=False)
+    
+    @staticmethod
+    def content_hash(df: pd.DataFrame) -> int:
+        """
+        DataFrameの内容のハッシュ値（st.cache_dataのキーに使う）
+        
+        読み込み直後に一度だけ計算して df.attrs['content_hash'] に保持し、以降はそれを返す。
+        attrsは絞り込みなどで派生したDataFrameにも引き継がれるため、読み込んだDataFrameに対してのみ使う。
+        """
+        cached = df.attrs.get('content_hash')
+        if cached is None:
+            cached = int(pd.util.hash_pandas_object(df, index=False).sum())
+            df.attrs['content_hash'] = cached
+        return cached
+    
+    @classmethod
+    def format_datetimes(cls, values: pd.Series, fmt: str) -> pd.Series:
+        """
+        日時列を文字列に変換（欠損はNaNのまま）
+        
+        タイムゾーンなしの日時列で書式がNumPyの単位に対応する場合は、要素ごとのstrftimeを通さず
+        datetime_as_stringでまとめて文字列化する。
+        
+        Args:
+            values: 日時列（日時型でなければパースする）
+            fmt: 書式（DISPLAY_DATETIME_FORMATSの値）
+        
+        Returns:
+            文字列化した列（インデックスはvaluesと同じ）
+        """
+        if not pd.api.types.is_datetime64_any_dtype(values.dtype):
+            values = pd.to_datetime(values, errors='coerce')
+        unit = cls._NUMPY_DATETIME_UNITS.get(fmt)
+        if unit is None or not isinstance(values.dtype, np.dtype):
+            # タイムゾーン付きなどはstrftimeで処理
+            return values.dt.strftime(fmt)
+        
+        raw = values.to_numpy()
+        formatted = np.datetime_as_string(raw, unit=unit).astype(object)
+        if unit != 'D':
+            formatted = np.char.replace(formatted.astype(str), 'T', ' ').astype(object)
+        formatted[np.isnat(raw)] = np.nan
+        return pd.Series(formatted, index=values.index, name=values.name)
+    
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """データのクリーニング（不正な文字の除去など）"""
         if df.empty:
@@ -174,38 +490,78 @@ class TradeDataManager:
         
         # 通貨ペアのクリーニング
         if 'currency_pair' in df.columns:
-            print(f"クリーニング前のcurrency_pair: {df['currency_pair'].unique()}")
-            # '#'や余分な空白を除去
-            df['currency_pair'] = df['currency_pair'].astype(str).str.replace('#', '', regex=False)
-            df['currency_pair'] = df['currency_pair'].str.strip()
-            df['currency_pair'] = df['currency_pair'].str.upper()  # 大文字に統一
-            # 空文字列をNaNに変換
-            df.loc[df['currency_pair'] == '', 'currency_pair'] = None
-            print(f"クリーニング後のcurrency_pair: {df['currency_pair'].unique()}")
+            if Config.DEBUG_LOG:
+                print(f"クリーニング前のcurrency_pair: {df['currency_pair'].unique()}")
+            # '#'・余分な空白の除去と大文字化（空文字列や'NAN'/'NONE'は欠損値に変換）
+            df['currency_pair'] = self._clean_labels(
+                df['currency_pair'],
+                lambda s: s.str.replace('#', '', regex=False).str.strip().str.upper(),
+                ['', 'NAN', 'NONE']
+            )
+            if Config.DEBUG_LOG:
+                print(f"クリーニング後のcurrency_pair: {df['currency_pair'].unique()}")
         
         # タイプのクリーニング
         if 'type' in df.columns:
-            print(f"クリーニング前のtype: {df['type'].unique()}")
-            # '#'を除去
-            df['type'] = df['type'].astype(str).str.replace('#', '', regex=False)
-            df['type'] = df['type'].str.strip()
-            df['type'] = df['type'].str.lower()  # 小文字に統一
-            # 空文字列をNaNに変換
-            df.loc[df['type'] == '', 'type'] = None
-            print(f"クリーニング後のtype: {df['type'].unique()}")
+            if Config.DEBUG_LOG:
+                print(f"クリーニング前のtype: {df['type'].unique()}")
+            # '#'・余分な空白の除去と小文字化（空文字列や'nan'/'none'は欠損値に変換）
+            df['type'] = self._clean_labels(
+                df['type'],
+                lambda s: s.str.replace('#', '', regex=False).str.strip().str.lower(),
+                ['', 'nan', 'none']
+            )
+            if Config.DEBUG_LOG:
+                print(f"クリーニング後のtype: {df['type'].unique()}")
         
         # 手法のクリーニング
         if 'strategy' in df.columns:
-            df['strategy'] = df['strategy'].astype(str).str.strip()
-            # 空文字列やnanをNaNに変換
-            df.loc[df['strategy'].isin(['', 'nan', 'None']), 'strategy'] = None
+            # 前後の空白を除去（大文字小文字を問わず空文字列や'nan'/'none'は欠損値に変換）
+            df['strategy'] = self._clean_labels(
+                df['strategy'],
+                lambda s: s.str.strip(),
+                ['', 'nan', 'none'],
+                case_insensitive=True
+            )
+        
+        # カテゴリ型に変換（unique()がカテゴリ数のオーダーになり、groupbyや比較も整数コードで行える）
+        # 欠損値は上で正規化済みのため、categoriesには有効な値だけが入る
+        for col in self.CATEGORY_COLUMNS:
+            if col in df.columns:
+                categorical = df[col].astype('category')
+                # StringDtypeのカテゴリが来た場合もobjectに戻す（取り出した欠損値がpd.NAではなくNaNになるように）
+                df[col] = categorical.cat.rename_categories(categorical.cat.categories.astype(object))
         
         print("=== _clean_data() 完了 ===")
         return df
     
+    @staticmethod
+    def _clean_labels(values: pd.Series, clean, missing: List[str], case_insensitive: bool = False) -> pd.Series:
+        """
+        ラベル列の文字列整形をユニーク値だけに適用して列全体に戻す
+        
+        通貨ペア・タイプ・手法は種類が少ないため、factorizeで値の種類ごとのコードに分け、
+        整形（StringDtypeの文字列演算）はユニーク値の配列に対してのみ行う。
+        
+        Args:
+            values: 整形する列
+            clean: StringDtypeのSeriesを受け取り整形後のSeriesを返す関数
+            missing: 整形後に欠損値とみなす値
+            case_insensitive: missingとの比較で大文字小文字を区別しない場合True
+        
+        Returns:
+            整形後の列（object型。欠損値はNaN）
+        """
+        codes, uniques = pd.factorize(values)  # 欠損値のコードは-1
+        cleaned = clean(pd.Series(uniques, dtype=STRING_DTYPE))
+        compared = cleaned.str.lower() if case_insensitive else cleaned
+        cleaned = cleaned.mask(compared.isin(missing)).to_numpy(dtype=object, na_value=np.nan)
+        # 末尾にNaNを足しておき、コード-1（欠損値）がそれを指すようにする
+        return pd.Series(np.append(cleaned, np.nan)[codes], index=values.index, name=values.name)
+    
     def update_review_comment(self, trade_id: int, comment: str) -> bool:
         """
-        特定のトレードの振り返りコメントを更新
+        特定のトレードの振り返りコメントを更新（bulk_update_review_commentsを1件で呼ぶ）
         
         Args:
             trade_id: 取引番号
@@ -214,65 +570,101 @@ class TradeDataManager:
         Returns:
             成功した場合True
         """
+        return self.bulk_update_review_comments([(trade_id, comment)]) == 1
+    
+    @_sheet_api
+    def update_cells_bulk(self, updates: List[Tuple[int, str, object]]) -> int:
+        """
+        複数トレードのセルをまとめて更新（1回のbatch_updateで書き込む）
+        
+        Args:
+            updates: (取引番号, 列名, 新しい値) のリスト。列名はシステム名（例: 'review_comment', 'strategy'）
+        
+        Returns:
+            更新したセル数
+        """
+        if not updates:
+            return 0
+        
         try:
-            # すべてのデータを取得
-            all_data = self.sheet.get_all_values()
-            
-            if not all_data or len(all_data) < 2:
-                print("データが見つかりません")
-                return False
-            
-            # ヘッダー行
-            headers = all_data[0]
+            needs_review_col = any(col == 'review_comment' for _, col, _ in updates)
             
-            # 振り返りコメント列のインデックス
-            if '振り返りコメント' not in headers:
-                # 列が存在しない場合は追加
-                self._add_review_column()
-                headers = self.sheet.row_values(1)
+            # 読み込み時の行番号が使えれば、シート全体は取得しない
+            row_by_trade_id = None
+            headers = self._header_cache
+            if not needs_review_col or (headers and self.COLUMN_MAPPING['review_comment'] in headers):
+                row_by_trade_id = self._cached_rows(sorted({str(trade_id) for trade_id, _, _ in updates}))
             
-            if '振り返りコメント' not in headers:
-                print("振り返りコメント列の追加に失敗しました")
-                return False
-            
-            comment_col_idx = headers.index('振り返りコメント') + 1
-            
-            # 取引番号列のインデックス
-            if '取引番号' not in headers:
-                print("取引番号列が見つかりません")
-                return False
-            
-            trade_id_col_idx = headers.index('取引番号')
+            if row_by_trade_id is None:
+                all_data = self.sheet.get_all_values()
+                
+                if not all_data or len(all_data) < 2:
+                    print("データが見つかりません")
+                    return 0
+                
+                headers = all_data[0]
+                
+                # 振り返りコメント列が存在しない場合は追加
+                if needs_review_col and self.COLUMN_MAPPING['review_comment'] not in headers:
+                    self._add_review_column()
+                    headers = self.sheet.row_values(1)
+                
+                if self.COLUMN_MAPPING['trade_id'] not in headers:
+                    print("取引番号列が見つかりません")
+                    return 0
+                trade_id_col_idx = headers.index(self.COLUMN_MAPPING['trade_id'])
+                
+                # 取引番号 → 行番号（1ベース、ヘッダーをスキップ）。次回以降の更新のためにキャッシュも更新
+                self._header_cache = headers
+                self._index_trade_rows(
+                    row[trade_id_col_idx] if trade_id_col_idx < len(row) else '' for row in all_data[1:]
+                )
+                row_by_trade_id = self._trade_id_row_index
             
-            # 該当行を探す
-            target_row = None
-            for row_idx, row_data in enumerate(all_data[1:], start=2):  # ヘッダーをスキップ
-                if row_idx <= len(all_data):
-                    try:
-                        # 取引番号を比較（文字列・数値両方に対応）
-                        if trade_id_col_idx < len(row_data):
-                            cell_value = str(row_data[trade_id_col_idx]).strip()
-                            if cell_value == str(trade_id):
-                                target_row = row_idx
-                                break
-                    except (ValueError, IndexError):
-                        continue
+            data = []
+            for trade_id, col, value in updates:
+                header = self.COLUMN_MAPPING.get(col)
+                if header not in headers:
+                    print(f"{header}列が見つかりません")
+                    continue
+                target_row = row_by_trade_id.get(str(trade_id))
+                if target_row is None:
+                    print(f"取引番号 {trade_id} が見つかりません")
+                    continue
+                if value is None or (isinstance(value, float) and np.isnan(value)):
+                    value = ''
+                data.append({
+                    'range': gspread.utils.rowcol_to_a1(target_row, headers.index(header) + 1),
+                    'values': [[value]]
+                })
             
-            if target_row is None:
-                print(f"取引番号 {trade_id} が見つかりません")
-                return False
+            if not data:
+                return 0
             
-            # コメントを更新
-            self.sheet.update_cell(target_row, comment_col_idx, comment)
-            print(f"取引番号 {trade_id} のコメントを更新しました（行: {target_row}, 列: {comment_col_idx}）")
-            return True
+            # update_cellと同じくユーザー入力として解釈させる
+            self.sheet.batch_update(data, value_input_option='USER_ENTERED')
+            print(f"{len(data)}件のセルをまとめて更新しました")
+            return len(data)
             
         except Exception as e:
-            print(f"コメント更新エラー: {type(e).__name__}: {e}")
+            print(f"一括更新エラー: {type(e).__name__}: {e}")
             import traceback
             traceback.print_exc()
-            return False
+            return 0
     
+    def bulk_update_review_comments(self, comments: List[Tuple[int, str]]) -> int:
+        """
+        複数トレードの振り返りコメントをまとめて更新
+        
+        Args:
+            comments: (取引番号, コメント) のリスト
+        
+        Returns:
+            更新したセル数
+        """
+        return self.update_cells_bulk([(trade_id, 'review_comment', comment) for trade_id, comment in comments])
+    
+    @_sheet_api
     def _add_review_column(self):
         """振り返りコメント列を追加"""
         headers = self.sheet.row_values(1)
@@ -282,7 +674,7 @@ class TradeDataManager:
     
     def update_strategy(self, trade_id: int, strategy: str) -> bool:
         """
-        指定した取引番号の手法を更新
+        指定した取引番号の手法を更新（update_cells_bulkを1件で呼ぶ）
         
         Args:
             trade_id: 取引番号
@@ -291,52 +683,9 @@ class TradeDataManager:
         Returns:
             bool: 更新成功の場合True
         """
-        try:
-            headers = self.sheet.row_values(1)
-            
-            # 取引番号列のインデックス
-            if '取引番号' not in headers:
-                print("取引番号列が見つかりません")
-                return False
-            trade_id_col_idx = headers.index('取引番号')
-            
-            # 手法列のインデックス
-            if '手法' not in headers:
-                print("手法列が見つかりません")
-                return False
-            strategy_col_idx = headers.index('手法') + 1  # gspreadは1ベース
-            
-            # 該当する行を検索
-            all_data = self.sheet.get_all_values()
-            target_row = None
-            
-            for row_idx, row_data in enumerate(all_data[1:], start=2):  # ヘッダーをスキップ
-                if row_idx <= len(all_data):
-                    try:
-                        # 取引番号を比較
-                        if trade_id_col_idx < len(row_data):
-                            cell_value = str(row_data[trade_id_col_idx]).strip()
-                            if cell_value == str(trade_id):
-                                target_row = row_idx
-                                break
-                    except (ValueError, IndexError):
-                        continue
-            
-            if target_row is None:
-                print(f"取引番号 {trade_id} が見つかりません")
-                return False
-            
-            # 手法を更新
-            self.sheet.update_cell(target_row, strategy_col_idx, strategy)
-            print(f"取引番号 {trade_id} の手法を '{strategy}' に更新しました（行: {target_row}, 列: {strategy_col_idx}）")
-            return True
-            
-        except Exception as e:
-            print(f"手法更新エラー: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        return self.update_cells_bulk([(trade_id, 'strategy', strategy)]) == 1
     
+    @_sheet_api
     def update_strategy_dropdown(self, strategies: List[str]):
         """
         手法列にデータ検証（プルダウン）を設定
@@ -345,7 +694,8 @@ class TradeDataManager:
             strategies: 手法名のリスト
         """
         try:
-            headers = self.sheet.row_values(1)
+            # 読み込み済みのヘッダー行に手法列があればそれを使い、ヘッダー行の取得を省く
+            headers = self._header_cache if self._header_cache and '手法' in self._header_cache else self.sheet.row_values(1)
             
             # 手法列のインデックスを取得
             if '手法' not in headers:
@@ -360,12 +710,18 @@ class TradeDataManager:
                 print("手法リストが空です")
                 return False
             
-            # 列の文字（A, B, C...）に変換
-            col_letter = chr(64 + strategy_col_idx)  # A=65
+            # 前回と同じ列・同じ手法リストなら書き込み済みなのでAPIを呼ばない
+            if self._applied_dropdown == (strategy_col_idx, list(strategies)):
+                return True
             
             # データ検証のルールを設定（2行目以降の全行）
-            last_row = max(1000, len(self.sheet.col_values(1)) + 100)  # 余裕を持たせる
-            range_name = f'{col_letter}2:{col_letter}{last_row}'
+            # 行数はワークシートのメタデータ（row_count）を使い、列全体の取得は行わない
+            last_row = max(1000, self.sheet.row_count)
+            # A1形式の範囲（Z列より後ろの列もAA, AB...と正しく表す）
+            range_name = (
+                f'{gspread.utils.rowcol_to_a1(2, strategy_col_idx)}:'
+                f'{gspread.utils.rowcol_to_a1(last_row, strategy_col_idx)}'
+            )
             
             # データ検証を設定
             validation_rule = {
@@ -393,6 +749,7 @@ class TradeDataManager:
             }
             
             self.spreadsheet.batch_update(validation_rule)
+            self._applied_dropdown = (strategy_col_idx, list(strategies))
             print(f"✓ 手法列にプルダウンを設定しました（{len(strategies)}件）")
             print(f"  手法: {', '.join(strategies[:5])}{'...' if len(strategies) > 5 else ''}")
             return True
@@ -417,13 +774,28 @@ class TradeDataManager:
 class TradeAnalyzer:
     """トレードデータの分析を行うクラス"""
     
+    # 分析用に付与する列のカテゴリ（この順序で集計結果を並べる）
+    MARKET_SESSIONS = ['東京', 'ロンドン', 'ニューヨーク', 'その他']
+    HOLDING_CATEGORIES = ['5分未満', '5分〜30分', '30分〜1時間', '1時間以上', '不明']
+    DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    
     def __init__(self, df: pd.DataFrame):
         """
         Args:
             df: トレードデータのDataFrame
         """
         print(f"TradeAnalyzer初期化: 元データ行数 = {len(df)}")
-        self.df = df.copy()
+        # 丸ごとのコピーはせず参照を持つ（呼び出し元のdfは_prepare_dataで書き換えない）
+        self.df = df
+        self._agg_cache = None
+        # 切り口ごとの集計結果（_agg_cacheをレベル単位で足し合わせたもの）
+        self._key_totals = {}
+        # 最大ドローダウン（累積損益を作る_prepare_dataで求めておく）
+        self._max_drawdown = 0
+        # 勝ち/負けの件数と損益合計（calculate_metrics用に_prepare_dataで求めておく）
+        self._n_win = 0
+        self._win_sum = 0.0
+        self._loss_sum = 0.0
         self._prepare_data()
         print(f"TradeAnalyzer初期化完了: 準備後のデータ行数 = {len(self.df)}")
     
@@ -432,55 +804,93 @@ class TradeAnalyzer:
         if self.df.empty:
             return
         
-        # 勝ち/負けのフラグ
-        self.df['is_win'] = self.df['net_profit_loss_jpy'] > 0
+        # 派生列を足すのは呼び出し元とは別のフレームに対して行う
+        # （日付で並べ替える場合はsort_valuesが新しいフレームを返すので、それ以外の時だけ列の入れ物を浅くコピー）
+        sort_by_date = 'net_profit_loss_jpy' in self.df.columns and 'date' in self.df.columns
+        if sort_by_date:
+            # 安定ソートで同じ日付のトレードは元の並び順を保つ
+            self.df = self.df.sort_values('date', kind='mergesort')
+        else:
+            self.df = self.df.copy(deep=False)
+        
+        # 行ごとに決まる派生列（TradeDataManagerで読み込んだデータには付与済みなので、その場合は作り直さない）
+        self.add_derived_columns(self.df)
         
-        # 日時関連の特徴量
-        if 'start_time' in self.df.columns:
-            self.df['hour'] = pd.to_datetime(self.df['start_time']).dt.hour
-            self.df['day_of_week'] = pd.to_datetime(self.df['start_time']).dt.dayofweek
-            self.df['day_name'] = pd.to_datetime(self.df['start_time']).dt.day_name()
+        # 行を抽出せず、NumPy配列上で勝ち/負けの件数と損益合計を一度だけ求める
+        pnl = self.df['net_profit_loss_jpy'].to_numpy(dtype=np.float64)
+        is_win = self.df['is_win'].to_numpy(dtype=bool)
+        self._n_win = int(np.count_nonzero(is_win))
+        self._win_sum = float(np.nansum(np.where(is_win, pnl, 0.0)))
+        self._loss_sum = float(abs(np.nansum(np.where(is_win, 0.0, pnl))))
+        
+        # 累積損益（日付順に並べ替え済み）
+        if sort_by_date:
+            self.df['cumulative_profit'] = self.df['net_profit_loss_jpy'].cumsum()
+            self._max_drawdown = self._calc_max_drawdown(
+                self.df['cumulative_profit'].to_numpy(dtype=np.float64)
+            )
+    
+    @classmethod
+    def add_derived_columns(cls, df: pd.DataFrame) -> None:
+        """
+        行ごとに値が決まる分析用の列（勝敗フラグ・時間帯・曜日・保有時間区分）をdfに追加する
+        
+        行の抽出後も値が変わらないため、TradeDataManagerの読み込み時に一度だけ付与しておけば
+        TradeAnalyzerを作るたびに計算し直す必要がない。既にある列は作り直さない。
+        """
+        # 勝ち/負けのフラグ
+        if 'is_win' not in df.columns:
+            df['is_win'] = df['net_profit_loss_jpy'] > 0
+        
+        # 日時関連の特徴量（開始日時のパースは一度だけ）
+        if 'start_time' in df.columns and 'hour' not in df.columns:
+            start_time = pd.to_datetime(df['start_time'])
+            df['hour'] = start_time.dt.hour
+            df['day_of_week'] = start_time.dt.dayofweek
+            # 切り口の列はカテゴリ型で持つ（groupby・比較が整数コードで済み、メモリも小さい）
+            df['day_name'] = pd.Categorical(start_time.dt.day_name(), categories=cls.DAY_NAMES)
             
             # 市場時間帯の判定
-            self.df['market_session'] = self.df['hour'].apply(self._get_market_session)
+            df['market_session'] = pd.Categorical(
+                cls._market_sessions(df['hour'].to_numpy(dtype=np.float64)), categories=cls.MARKET_SESSIONS
+            )
         
         # 保有時間のカテゴリ化
-        if 'holding_time_sec' in self.df.columns:
-            self.df['holding_category'] = self.df['holding_time_sec'].apply(
-                self._categorize_holding_time
+        if 'holding_time_sec' in df.columns and 'holding_category' not in df.columns:
+            df['holding_category'] = pd.Categorical(
+                cls._holding_categories(df['holding_time_sec'].to_numpy(dtype=np.float64)),
+                categories=cls.HOLDING_CATEGORIES
             )
-        
-        # 累積損益
-        if 'net_profit_loss_jpy' in self.df.columns and 'date' in self.df.columns:
-            self.df = self.df.sort_values('date')
-            self.df['cumulative_profit'] = self.df['net_profit_loss_jpy'].cumsum()
     
     @staticmethod
-    def _get_market_session(hour: int) -> str:
-        """時間帯から市場セッションを判定（UTC+9基準）"""
-        if 9 <= hour < 15:
-            return '東京'
-        elif 16 <= hour < 24:
-            return 'ロンドン'
-        elif 0 <= hour < 6 or 22 <= hour < 24:
-            return 'ニューヨーク'
-        else:
-            return 'その他'
+    def _calc_max_drawdown(cumulative: np.ndarray) -> float:
+        """累積損益の配列から最大ドローダウンを求める（NaNは無視）"""
+        if _max_drawdown_jit is not None:
+            return float(_max_drawdown_jit(cumulative))
+        valid = cumulative[~np.isnan(cumulative)]
+        if valid.size == 0:
+            return 0.0
+        # pandasのcummaxを介さず、配列上の累積最大値との差から求める
+        return float((np.maximum.accumulate(valid) - valid).max())
+    
+    @staticmethod
+    def _market_sessions(hours: np.ndarray) -> np.ndarray:
+        """時間帯から市場セッションを判定（UTC+9基準。条件は上から順に評価し、時刻が欠損の場合は'その他'）"""
+        conditions = [
+            (hours >= 9) & (hours < 15),
+            (hours >= 16) & (hours < 24),
+            ((hours >= 0) & (hours < 6)) | ((hours >= 22) & (hours < 24)),
+        ]
+        return np.select(conditions, ['東京', 'ロンドン', 'ニューヨーク'], default='その他').astype(object)
     
     @staticmethod
-    def _categorize_holding_time(seconds: float) -> str:
-        """保有時間をカテゴリ化"""
-        if pd.isna(seconds):
-            return '不明'
+    def _holding_categories(seconds: np.ndarray) -> np.ndarray:
+        """保有時間をカテゴリ化（欠損は'不明'）"""
         minutes = seconds / 60
-        if minutes < 5:
-            return '5分未満'
-        elif minutes < 30:
-            return '5分〜30分'
-        elif minutes < 60:
-            return '30分〜1時間'
-        else:
-            return '1時間以上'
+        conditions = [minutes < 5, minutes < 30, minutes < 60, minutes >= 60]
+        return np.select(
+            conditions, ['5分未満', '5分〜30分', '30分〜1時間', '1時間以上'], default='不明'
+        ).astype(object)
     
     def calculate_metrics(self) -> Dict:
         """主要メトリクスを計算"""
@@ -488,26 +898,21 @@ class TradeAnalyzer:
             return {}
         
         total_trades = len(self.df)
-        winning_trades = len(self.df[self.df['is_win']])
+        # 勝ち/負けの件数と損益合計は_prepare_dataで計算済み
+        winning_trades = self._n_win
         losing_trades = total_trades - winning_trades
         
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
         
-        total_profit = self.df[self.df['is_win']]['net_profit_loss_jpy'].sum()
-        total_loss = abs(self.df[~self.df['is_win']]['net_profit_loss_jpy'].sum())
+        total_profit = self._win_sum
+        total_loss = self._loss_sum
         
         profit_factor = (total_profit / total_loss) if total_loss > 0 else float('inf')
         
         avg_pips = self.df['pips'].mean() if 'pips' in self.df.columns else 0
         
-        # 最大ドローダウンの計算
-        if 'cumulative_profit' in self.df.columns:
-            cumulative = self.df['cumulative_profit']
-            running_max = cumulative.cummax()
-            drawdown = cumulative - running_max
-            max_drawdown = abs(drawdown.min())
-        else:
-            max_drawdown = 0
+        # 最大ドローダウン（_prepare_dataで計算済み）
+        max_drawdown = self._max_drawdown
         
         total_net_profit = self.df['net_profit_loss_jpy'].sum()
         
@@ -524,28 +929,63 @@ class TradeAnalyzer:
             'total_loss': total_loss
         }
     
+    # 分析の切り口となる列（1回のgroupbyでまとめて集計する）
+    GROUP_KEYS = ['strategy', 'currency_pair', 'holding_category', 'day_name', 'market_session']
+    
+    def _group_totals(self, key: str) -> pd.DataFrame:
+        """
+        指定した切り口の集計値（合計・件数）を返す
+        
+        全ての切り口を組み合わせた1回のgroupbyで合計と件数を求めて保持し、
+        各切り口はその結果をレベル単位で足し合わせて求める（切り口ごとの結果も保持する）
+        """
+        if key in self._key_totals:
+            return self._key_totals[key]
+        
+        if self._agg_cache is None:
+            keys = [k for k in self.GROUP_KEYS if k in self.df.columns]
+            df_agg = self.df[keys].copy()
+            df_agg['profit_sum'] = self.df['net_profit_loss_jpy']
+            df_agg['profit_count'] = self.df['net_profit_loss_jpy'].notna()
+            df_agg['pips_sum'] = self.df['pips'] if 'pips' in self.df.columns else np.nan
+            df_agg['pips_count'] = df_agg['pips_sum'].notna()
+            df_agg['win_count'] = self.df['is_win']
+            df_agg['rows'] = 1
+            self._agg_cache = df_agg.groupby(keys, observed=True, dropna=False).sum()
+        
+        totals = self._agg_cache.groupby(level=key, observed=True).sum()
+        self._key_totals[key] = totals
+        return totals
+    
+    @staticmethod
+    def _summarize_totals(totals: pd.DataFrame, with_pips: bool = False) -> pd.DataFrame:
+        """_group_totalsの合計・件数から 合計損益/平均損益/取引数/(平均pips)/勝率 を求める"""
+        summary = pd.DataFrame(index=totals.index)
+        summary['合計損益'] = totals['profit_sum']
+        summary['平均損益'] = totals['profit_sum'] / totals['profit_count'].where(totals['profit_count'] > 0)
+        summary['取引数'] = totals['profit_count']
+        if with_pips:
+            summary['平均pips'] = totals['pips_sum'] / totals['pips_count'].where(totals['pips_count'] > 0)
+        summary['勝率'] = totals['win_count'] / totals['rows']
+        summary = summary.round(2)
+        summary['勝率'] = (summary['勝率'] * 100).round(2)
+        return summary
+    
     def analyze_by_strategy(self) -> pd.DataFrame:
         """手法別の分析"""
         if self.df.empty or 'strategy' not in self.df.columns:
             return pd.DataFrame()
         
+        totals = self._group_totals('strategy')
+        
         # NaNや空文字列を除外
-        df_valid = self.df.copy()
-        df_valid = df_valid[df_valid['strategy'].notna()]
-        df_valid = df_valid[df_valid['strategy'].astype(str).str.strip() != '']
-        df_valid = df_valid[df_valid['strategy'].astype(str).str.lower() != 'nan']
+        names = totals.index.astype(str)
+        totals = totals[(names.str.strip() != '') & (names.str.lower() != 'nan')]
         
-        if df_valid.empty:
+        if totals.empty:
             return pd.DataFrame()
         
-        grouped = df_valid.groupby('strategy').agg({
-            'net_profit_loss_jpy': ['sum', 'mean', 'count'],
-            'pips': 'mean',
-            'is_win': 'mean'
-        }).round(2)
-        
-        grouped.columns = ['合計損益', '平均損益', '取引数', '平均pips', '勝率']
-        grouped['勝率'] = (grouped['勝率'] * 100).round(2)
+        grouped = self._summarize_totals(totals, with_pips=True)
         
         return grouped.sort_values('合計損益', ascending=False)
     
@@ -554,14 +994,7 @@ class TradeAnalyzer:
         if self.df.empty or 'currency_pair' not in self.df.columns:
             return pd.DataFrame()
         
-        grouped = self.df.groupby('currency_pair').agg({
-            'net_profit_loss_jpy': ['sum', 'mean', 'count'],
-            'pips': 'mean',
-            'is_win': 'mean'
-        }).round(2)
-        
-        grouped.columns = ['合計損益', '平均損益', '取引数', '平均pips', '勝率']
-        grouped['勝率'] = (grouped['勝率'] * 100).round(2)
+        grouped = self._summarize_totals(self._group_totals('currency_pair'), with_pips=True)
         
         return grouped.sort_values('合計損益', ascending=False)
     
@@ -570,9 +1003,9 @@ class TradeAnalyzer:
         if self.df.empty or 'date' not in self.df.columns:
             return pd.DataFrame()
         
-        df_temp = self.df.copy()
-        df_temp['date'] = pd.to_datetime(df_temp['date'])
-        df_temp.set_index('date', inplace=True)
+        df_temp = self.df.set_index('date')
+        if not pd.api.types.is_datetime64_any_dtype(df_temp.index):
+            df_temp.index = pd.to_datetime(df_temp.index)
         
         grouped = df_temp.resample(period).agg({
             'net_profit_loss_jpy': ['sum', 'count'],
@@ -589,17 +1022,10 @@ class TradeAnalyzer:
         if self.df.empty or 'holding_category' not in self.df.columns:
             return pd.DataFrame()
         
-        grouped = self.df.groupby('holding_category').agg({
-            'net_profit_loss_jpy': ['sum', 'mean', 'count'],
-            'is_win': 'mean'
-        }).round(2)
-        
-        grouped.columns = ['合計損益', '平均損益', '取引数', '勝率']
-        grouped['勝率'] = (grouped['勝率'] * 100).round(2)
+        grouped = self._summarize_totals(self._group_totals('holding_category'))
         
         # カテゴリの順序を設定
-        category_order = ['5分未満', '5分〜30分', '30分〜1時間', '1時間以上', '不明']
-        grouped = grouped.reindex([c for c in category_order if c in grouped.index])
+        grouped = grouped.reindex([c for c in self.HOLDING_CATEGORIES if c in grouped.index])
         
         return grouped
     
@@ -608,17 +1034,10 @@ class TradeAnalyzer:
         if self.df.empty or 'day_of_week' not in self.df.columns:
             return pd.DataFrame()
         
-        grouped = self.df.groupby('day_name').agg({
-            'net_profit_loss_jpy': ['sum', 'mean', 'count'],
-            'is_win': 'mean'
-        }).round(2)
-        
-        grouped.columns = ['合計損益', '平均損益', '取引数', '勝率']
-        grouped['勝率'] = (grouped['勝率'] * 100).round(2)
+        grouped = self._summarize_totals(self._group_totals('day_name'))
         
         # 曜日の順序を設定
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        grouped = grouped.reindex([d for d in day_order if d in grouped.index])
+        grouped = grouped.reindex([d for d in self.DAY_NAMES if d in grouped.index])
         
         return grouped
     
@@ -627,65 +1046,56 @@ class TradeAnalyzer:
         if self.df.empty or 'market_session' not in self.df.columns:
             return pd.DataFrame()
         
-        grouped = self.df.groupby('market_session').agg({
-            'net_profit_loss_jpy': ['sum', 'mean', 'count'],
-            'is_win': 'mean'
-        }).round(2)
-        
-        grouped.columns = ['合計損益', '平均損益', '取引数', '勝率']
-        grouped['勝率'] = (grouped['勝率'] * 100).round(2)
+        grouped = self._summarize_totals(self._group_totals('market_session'))
         
         return grouped.sort_values('合計損益', ascending=False)
     
     def get_consecutive_losses(self) -> Tuple[int, float, List[Dict]]:
-        """連続損失の分析"""
+        """
+        連続損失の分析
+        
+        Returns:
+            (最大連敗数, その際の合計損失, 3連敗以上の履歴)
+            履歴の各要素は {'count', 'total_loss', 'index'} で、'index' はself.dfの行ラベルのリスト
+        """
         if self.df.empty:
             return 0, 0, []
         
         df_sorted = self.df.sort_values('date')
         
-        max_consecutive = 0
-        current_consecutive = 0
-        max_loss_amount = 0
-        current_loss_amount = 0
-        
-        loss_streaks = []
-        current_streak = []
+        # 負け（is_winでない）の連続区間をランレングスで求める（区間は[starts, ends)）
+        losses = ~df_sorted['is_win'].to_numpy(dtype=bool)
+        abs_pnl = np.abs(df_sorted['net_profit_loss_jpy'].to_numpy(dtype=np.float64))
+        if _loss_streaks_jit is not None:
+            # numbaが使える場合は1パスの走査で区間と損失額の合計をまとめて求める
+            starts, lengths, totals = _loss_streaks_jit(losses, abs_pnl)
+            ends = starts + lengths
+        else:
+            edges = np.diff(np.concatenate(([0], losses.astype(np.int8), [0])))
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1)
+            lengths = ends - starts
+            if len(starts) > 0:
+                # 各区間の損失額の合計（末尾の区間でもreduceatの添字が範囲内に収まるよう0を足しておく）
+                totals = np.add.reduceat(np.append(abs_pnl, 0.0), np.column_stack((starts, ends)).ravel())[::2]
+        if len(starts) == 0:
+            return 0, 0, []
         
-        for idx, row in df_sorted.iterrows():
-            if not row['is_win']:
-                current_consecutive += 1
-                current_loss_amount += abs(row['net_profit_loss_jpy'])
-                current_streak.append(row.to_dict())
-            else:
-                if current_consecutive > 0:
-                    if current_consecutive > max_consecutive:
-                        max_consecutive = current_consecutive
-                        max_loss_amount = current_loss_amount
-                    
-                    if current_consecutive >= 3:  # 3連敗以上を記録
-                        loss_streaks.append({
-                            'count': current_consecutive,
-                            'total_loss': current_loss_amount,
-                            'trades': current_streak.copy()
-                        })
-                
-                current_consecutive = 0
-                current_loss_amount = 0
-                current_streak = []
-        
-        # 最後が連敗で終わった場合の処理
-        if current_consecutive > 0:
-            if current_consecutive > max_consecutive:
-                max_consecutive = current_consecutive
-                max_loss_amount = current_loss_amount
-            
-            if current_consecutive >= 3:
-                loss_streaks.append({
-                    'count': current_consecutive,
-                    'total_loss': current_loss_amount,
-                    'trades': current_streak.copy()
-                })
+        # 最大連敗（同数の場合は先に現れたもの）
+        longest = int(np.argmax(lengths))
+        max_consecutive = int(lengths[longest])
+        max_loss_amount = float(totals[longest])
+        
+        # 3連敗以上の履歴だけ行ラベルを取り出す
+        labels = df_sorted.index
+        loss_streaks = [
+            {
+                'count': int(lengths[i]),
+                'total_loss': float(totals[i]),
+                'index': labels[starts[i]:ends[i]].tolist()
+            }
+            for i in np.flatnonzero(lengths >= 3)
+        ]
         
         return max_consecutive, max_loss_amount, loss_streaks
     
@@ -694,82 +1104,93 @@ class TradeAnalyzer:
         if self.df.empty:
             return pd.DataFrame()
         
-        losing_trades = self.df[~self.df['is_win']].copy()
-        top_losses = losing_trades.nsmallest(n, 'net_profit_loss_jpy')
+        # 負けトレード（損益が欠損の行は除く）の位置だけを求め、行のコピーは最後の抽出1回にする
+        pnl = self.df['net_profit_loss_jpy'].to_numpy(dtype=np.float64)
+        losing = np.flatnonzero(~self.df['is_win'].to_numpy(dtype=bool) & ~np.isnan(pnl))
+        losing_pnl = pnl[losing]
+        if n <= 0:
+            top = losing[:0]
+        elif len(losing) <= n:
+            top = losing[np.argsort(losing_pnl, kind='stable')]
+        else:
+            # 全体をソートせず、上位n件だけを部分ソートで取り出してから並べる
+            part = np.argpartition(losing_pnl, n - 1)[:n]
+            top = losing[part[np.argsort(losing_pnl[part], kind='stable')]]
         
-        return top_losses
+        return self.df.iloc[top]
     
     def get_filtered_trades(self, filters: Dict) -> pd.DataFrame:
         """フィルタ条件に基づいてトレードを抽出"""
-        filtered_df = self.df.copy()
-        original_count = len(filtered_df)
+        df = self.df
+        original_count = len(df)
+        # 各フィルターの条件を1つのマスクにまとめ、最後に一度だけ抽出する
+        # （途中でDataFrameを作り直さない）
+        mask = np.ones(original_count, dtype=bool)
         
         print(f"=== フィルター開始 ===")
         print(f"元データ行数: {original_count}")
         print(f"適用するフィルター: {filters}")
         
-        # データの実際の値を確認（先頭5行）
-        if 'currency_pair' in filtered_df.columns:
-            print(f"currency_pair列の実際の値（ユニーク）: {filtered_df['currency_pair'].unique()}")
+        # データの実際の値を確認（unique()は列全体を走査するのでデバッグ時のみ）
+        if Config.DEBUG_LOG and 'currency_pair' in df.columns:
+            print(f"currency_pair列の実際の値（ユニーク）: {df['currency_pair'].unique()}")
         
         # 通貨ペアでフィルター
         if 'currency_pair' in filters and filters['currency_pair']:
             if filters['currency_pair'] != 'すべて':
-                before_count = len(filtered_df)
-                # データは既にクリーニング済みなので直接比較
-                filtered_df = filtered_df[
-                    filtered_df['currency_pair'] == filters['currency_pair']
-                ]
-                print(f"通貨ペアフィルター '{filters['currency_pair']}': {before_count} → {len(filtered_df)}")
+                before_count = int(mask.sum())
+                # データは既にクリーニング済みなので直接比較（カテゴリ型ならコード同士の比較になる）
+                mask &= (df['currency_pair'] == filters['currency_pair']).to_numpy()
+                print(f"通貨ペアフィルター '{filters['currency_pair']}': {before_count} → {int(mask.sum())}")
         
         # タイプでフィルター
         if 'type' in filters and filters['type']:
             if filters['type'] != 'すべて':
-                before_count = len(filtered_df)
+                before_count = int(mask.sum())
                 # データは既にクリーニング済みなので直接比較
-                filtered_df = filtered_df[
-                    filtered_df['type'] == filters['type']
-                ]
-                print(f"タイプフィルター '{filters['type']}': {before_count} → {len(filtered_df)}")
+                mask &= (df['type'] == filters['type']).to_numpy()
+                print(f"タイプフィルター '{filters['type']}': {before_count} → {int(mask.sum())}")
         
         # 手法でフィルター
         if 'strategy' in filters and filters['strategy']:
             if filters['strategy'] != 'すべて':
-                before_count = len(filtered_df)
+                before_count = int(mask.sum())
                 # データは既にクリーニング済みなので直接比較
-                filtered_df = filtered_df[
-                    filtered_df['strategy'] == filters['strategy']
-                ]
-                print(f"手法フィルター '{filters['strategy']}': {before_count} → {len(filtered_df)}")
+                mask &= (df['strategy'] == filters['strategy']).to_numpy()
+                print(f"手法フィルター '{filters['strategy']}': {before_count} → {int(mask.sum())}")
         
         # 日付範囲でフィルター
         if 'date_range' in filters and filters['date_range']:
-            before_count = len(filtered_df)
-            start_date, end_date = filters['date_range']
+            before_count = int(mask.sum())
+            # 範囲の端はここで一度だけTimestampにする
+            start_date, end_date = (pd.Timestamp(d) for d in filters['date_range'])
+            
+            # date列は読み込み時にdatetime型へ変換済みなので、再パースせずにそのまま比較する
+            dates = df['date']
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates, errors='coerce')
+            in_range = ((dates >= start_date) & (dates <= end_date)).to_numpy()
             
-            # デバッグ: 日付データの確認
+            # デバッグ: 日付データの確認（ここまでのフィルターを通過した行が対象）
             print(f"日付フィルター範囲: {start_date} ~ {end_date}")
-            print(f"データの日付範囲: {pd.to_datetime(filtered_df['date']).min()} ~ {pd.to_datetime(filtered_df['date']).max()}")
-            print(f"範囲外の行数: {len(filtered_df[(pd.to_datetime(filtered_df['date']) < pd.to_datetime(start_date)) | (pd.to_datetime(filtered_df['date']) > pd.to_datetime(end_date))])}")
+            print(f"データの日付範囲: {dates[mask].min()} ~ {dates[mask].max()}")
+            print(f"範囲外の行数: {int((mask & ~in_range).sum())}")
             
-            filtered_df = filtered_df[
-                (pd.to_datetime(filtered_df['date']) >= pd.to_datetime(start_date)) &
-                (pd.to_datetime(filtered_df['date']) <= pd.to_datetime(end_date))
-            ]
-            print(f"日付フィルター {start_date} ~ {end_date}: {before_count} → {len(filtered_df)}")
+            mask &= in_range
+            print(f"日付フィルター {start_date} ~ {end_date}: {before_count} → {int(mask.sum())}")
         
         if 'profit_range' in filters and filters['profit_range']:
             min_profit, max_profit = filters['profit_range']
-            filtered_df = filtered_df[
-                (filtered_df['net_profit_loss_jpy'] >= min_profit) &
-                (filtered_df['net_profit_loss_jpy'] <= max_profit)
-            ]
+            profit = df['net_profit_loss_jpy']
+            mask &= ((profit >= min_profit) & (profit <= max_profit)).to_numpy()
         
         if 'only_losses' in filters and filters['only_losses']:
-            before_count = len(filtered_df)
-            filtered_df = filtered_df[~filtered_df['is_win']]
-            print(f"負けトレードのみフィルター: {before_count} → {len(filtered_df)}")
+            before_count = int(mask.sum())
+            mask &= ~df['is_win'].to_numpy(dtype=bool)
+            print(f"負けトレードのみフィルター: {before_count} → {int(mask.sum())}")
         
+        # ブールインデックスは新しいDataFrameを返すので、元データのコピーは不要
+        filtered_df = df[mask]
         print(f"=== フィルター完了: 最終結果 {len(filtered_df)}件 ===\n")
         return filtered_df
 
@@ -777,6 +1198,9 @@ class TradeAnalyzer:
 class StrategyManager:
     """手法管理クラス - ローカルJSONとGoogle Sheetsの手法を統合管理"""
     
+    # 手法の保存・追加からプルダウンを更新するまでの待ち時間（秒）。続けて保存した場合は1回にまとめる
+    DROPDOWN_UPDATE_DELAY = 2.0
+    
     def __init__(self, strategy_storage=None, sheets_manager=None):
         """
         Args:
@@ -786,6 +1210,8 @@ class StrategyManager:
         self.strategy_storage = strategy_storage
         self.sheets_manager = sheets_manager
         self.strategies = {}  # {手法名: {source, rules, ...}}
+        self._dropdown_lock = threading.Lock()
+        self._dropdown_timer = None
     
     def load_all_strategies(self) -> Dict[str, Dict]:
         """
@@ -821,16 +1247,15 @@ class StrategyManager:
             if 'strategy' in df.columns:
                 gsheet_strategies = df['strategy'].dropna().unique()
                 print(f"Google Sheetsから {len(gsheet_strategies)} 件の手法を発見")
-                for strategy_name in gsheet_strategies:
-                    strategy_name = str(strategy_name).strip()
-                    if strategy_name and strategy_name.lower() != 'nan':
-                        # ローカルJSONに既にある場合はスキップ（ローカルを優先）
-                        if strategy_name not in self.strategies:
-                            self.strategies[strategy_name] = {
-                                'source': 'sheets',
-                                'rules': '',
-                            }
-                            print(f"  - {strategy_name} (Google Sheetsのみ)")
+                # 前後空白の除去と空文字/'nan'/'none'の除外はSeriesの文字列演算でまとめて行う
+                # （ユニーク値をそのままstring型にするので、Pythonのリストを経由しない）
+                names = pd.Series(gsheet_strategies, dtype=STRING_DTYPE).str.strip()
+                names = names[names.notna() & names.ne('') & ~names.str.lower().isin(['nan', 'none'])].unique()
+                for strategy_name in names:
+                    # ローカルJSONに既にある場合はそのまま（ローカルを優先）
+                    entry = self.strategies.setdefault(strategy_name, {'source': 'sheets', 'rules': ''})
+                    if entry['source'] == 'sheets':
+                        print(f"  - {strategy_name} (Google Sheetsのみ)")
         
         print(f"=== 手法を {len(self.strategies)} 件読み込みました ===")
         return self.strategies
@@ -874,7 +1299,7 @@ class StrategyManager:
             print(f"✓ ルールの保存に成功しました")
             
             # Google Sheetsのプルダウンを更新
-            self._update_sheets_dropdown()
+            self.schedule_sheets_dropdown_update()
         else:
             print(f"✗ ルールの保存に失敗しました")
         
@@ -911,13 +1336,41 @@ class StrategyManager:
                 }
                 
                 # Google Sheetsのプルダウンを更新
-                self._update_sheets_dropdown()
+                self.schedule_sheets_dropdown_update()
                 
                 return True
         
         return False
     
-    def _update_sheets_dropdown(self):
+    def schedule_sheets_dropdown_update(self):
+        """
+        Google Sheetsの手法プルダウンの更新を予約
+        
+        DROPDOWN_UPDATE_DELAY秒以内に続けて呼ばれた場合は最後の1回だけを反映する（Sheets APIの書き込み回数を抑える）
+        """
+        if not self.sheets_manager:
+            print("sheets_managerが設定されていないため、プルダウン更新をスキップしました")
+            return
+        with self._dropdown_lock:
+            if self._dropdown_timer is not None:
+                self._dropdown_timer.cancel()
+            self._dropdown_timer = threading.Timer(self.DROPDOWN_UPDATE_DELAY, self.flush_sheets_dropdown)
+            self._dropdown_timer.daemon = True
+            self._dropdown_timer.start()
+            # 終了時の反映対象に登録（弱参照なので、不要になったインスタンスは保持し続けない）
+            _pending_dropdown_managers.add(self)
+    
+    def flush_sheets_dropdown(self):
+        """予約されているプルダウン更新があれば、最新の手法リストで今すぐ反映する"""
+        with self._dropdown_lock:
+            if self._dropdown_timer is None:
+                return
+            self._dropdown_timer.cancel()
+            self._dropdown_timer = None
+            _pending_dropdown_managers.discard(self)
+        self._apply_sheets_dropdown()
+    
+    def _apply_sheets_dropdown(self):
         """Google Sheetsの手法プルダウンを更新"""
         if self.sheets_manager:
             try:
@@ -932,3 +1385,16 @@ class StrategyManager:
                 print(f"警告: プルダウン更新中にエラーが発生しました: {e}")
         else:
             print("sheets_managerが設定されていないため、プルダウン更新をスキップしました")
+
+
+# プルダウン更新を予約中のStrategyManager（終了時にまとめて反映する。atexitへの登録はモジュールで1回だけ）
+_pending_dropdown_managers = weakref.WeakSet()
+
+
+def _flush_pending_dropdowns():
+    """終了時に未反映のプルダウン更新を反映"""
+    for manager in list(_pending_dropdown_managers):
+        manager.flush_sheets_dropdown()
+
+
+atexit.register(_flush_pending_dropdowns)
@@ -6,6 +6,8 @@ MT5から取引履歴を取得し、Notionデータベースに自動で記録
 """
 import sys
 import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from config import Config
 from mt5_report_parser import MT5ReportParser
@@ -17,19 +19,37 @@ def find_latest_report(reports_dir: str = 'reports') -> str:
     if not os.path.exists(reports_dir):
         return None
     
-    files = []
-    for file in os.listdir(reports_dir):
-        if file.endswith(('.html', '.csv')):
-            file_path = os.path.join(reports_dir, file)
-            mtime = os.path.getmtime(file_path)
-            files.append((file_path, mtime))
-    
-    if not files:
+    # scandirのエントリからパスと更新時刻を取り、1回の走査で最新のファイルを求める
+    with os.scandir(reports_dir) as entries:
+        latest = max(
+            (entry for entry in entries if entry.name.endswith(('.html', '.csv'))),
+            key=lambda entry: entry.stat().st_mtime,
+            default=None
+        )
+    return latest.path if latest else None
+
+
+def open_sheets_client():
+    """Google Sheets連携が有効な場合にクライアントを作成（設定不足・接続エラー時はNone）"""
+    if not Config.GOOGLE_SHEETS_ENABLED:
         return None
-    
-    # 最新のファイルを返す
-    files.sort(key=lambda x: x[1], reverse=True)
-    return files[0][0]
+    if not Config.GOOGLE_SHEETS_SPREADSHEET_ID:
+        print("⚠ GOOGLE_SHEETS_SPREADSHEET_IDが設定されていません（スキップ）")
+        return None
+    if not Config.GOOGLE_SHEETS_CREDENTIALS_FILE:
+        print("⚠ GOOGLE_SHEETS_CREDENTIALS_FILEが設定されていません（スキップ）")
+        return None
+    try:
+        return SheetsClient(
+            credentials_file=Config.GOOGLE_SHEETS_CREDENTIALS_FILE,
+            spreadsheet_id=Config.GOOGLE_SHEETS_SPREADSHEET_ID
+        )
+    except FileNotFoundError as e:
+        print(f"⚠ 認証ファイルが見つかりません: {e}")
+        print("  Google Sheets連携の設定を確認してください")
+    except Exception as e:
+        print(f"⚠ Google Sheetsへの接続でエラーが発生しました: {e}")
+    return None
 
 
 def main(report_file: str = None):
@@ -89,50 +109,57 @@ def main(report_file: str = None):
             database_id=Config.NOTION_DATABASE_ID
         )
         
-        stats, ticket_to_url = notion.sync_trades(trades)
+        # Google Sheetsへの行の追加（オプション）はNotionのURLを必要としないので、Notionへの同期と並行して行う
+        sheets = open_sheets_client()
+        if sheets:
+            print("\n[4/4] Google Sheetsに同期中（Notionと並行）...")
         
-        # 結果表示
-        print("\n" + "=" * 60)
-        print("【Notion同期結果】")
-        if stats['new'] > 0:
-            print(f"✓ {stats['new']}件の新しい取引を記録しました")
-        else:
-            print("新しい取引はありませんでした")
-        print("=" * 60)
-        
-        # Google Sheetsに同期（オプション）
-        if Config.GOOGLE_SHEETS_ENABLED:
-            print("\n[4/4] Google Sheetsに同期中...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sheets_future = executor.submit(sheets.append_rows, trades) if sheets else None
             try:
-                if not Config.GOOGLE_SHEETS_SPREADSHEET_ID:
-                    print("⚠ GOOGLE_SHEETS_SPREADSHEET_IDが設定されていません（スキップ）")
-                elif not Config.GOOGLE_SHEETS_CREDENTIALS_FILE:
-                    print("⚠ GOOGLE_SHEETS_CREDENTIALS_FILEが設定されていません（スキップ）")
-                else:
-                    sheets = SheetsClient(
-                        credentials_file=Config.GOOGLE_SHEETS_CREDENTIALS_FILE,
-                        spreadsheet_id=Config.GOOGLE_SHEETS_SPREADSHEET_ID
-                    )
-                    
-                    # NotionページURLのマッピングを渡す
-                    sheets_stats = sheets.sync_trades(trades, ticket_to_url)
+                stats, ticket_to_url = notion.sync_trades(trades)
+            except Exception:
+                # Sheetsには既に行を追加しているため、リンク未設定のまま残る行を知らせる
+                # （これらの行には次回の実行時にリンクが設定される）
+                if sheets_future:
+                    try:
+                        _, ticket_to_row = sheets_future.result()
+                        if ticket_to_row:
+                            print(f"⚠ Notionへの同期に失敗したため、次の{len(ticket_to_row)}件の取引はNotionリンクなしでGoogle Sheetsに記録されています")
+                            print(f"  {', '.join(ticket_to_row)}")
+                            print("  次回の実行時にリンクを設定します")
+                    except Exception as e:
+                        print(f"⚠ Google Sheets同期でエラーが発生しました: {e}")
+                raise
+            
+            # 結果表示
+            print("\n" + "=" * 60)
+            print("【Notion同期結果】")
+            if stats['new'] > 0:
+                print(f"✓ {stats['new']}件の新しい取引を記録しました")
+            else:
+                print("新しい取引はありませんでした")
+            print("=" * 60)
+            
+            if sheets_future:
+                try:
+                    sheets_stats, ticket_to_row = sheets_future.result()
+                    # 追加した行にNotionページURLのリンクを設定
+                    linked = sheets.patch_links(ticket_to_row, ticket_to_url)
                     
                     print("\n" + "=" * 60)
                     print("【Google Sheets同期結果】")
                     if sheets_stats['new'] > 0:
                         print(f"✓ {sheets_stats['new']}件の新しい取引を記録しました")
-                        if ticket_to_url:
-                            print(f"  ({len(ticket_to_url)}件にNotionリンクを設定)")
+                        if linked:
+                            print(f"  ({linked}件にNotionリンクを設定)")
                     else:
                         print("新しい取引はありませんでした")
                     print("=" * 60)
                     
-            except FileNotFoundError as e:
-                print(f"⚠ 認証ファイルが見つかりません: {e}")
-                print("  Google Sheets連携の設定を確認してください")
-            except Exception as e:
-                print(f"⚠ Google Sheets同期でエラーが発生しました: {e}")
-                print("  Notionへの同期は完了しています")
+                except Exception as e:
+                    print(f"⚠ Google Sheets同期でエラーが発生しました: {e}")
+                    print("  Notionへの同期は完了しています")
         
         return 0
     
@@ -144,7 +171,6 @@ def main(report_file: str = None):
     
     except Exception as e:
         print(f"\n✗ エラーが発生しました: {e}")
-        import traceback
         traceback.print_exc()
         return 1
 
@@ -1,9 +1,51 @@
 """MT5接続・データ取得モジュール"""
+import time
 import MetaTrader5 as mt5
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
+from dateutil.tz import tzlocal
 from typing import List, Dict, Optional
 
 
+# エントリータイプ（TradeDeal.entry）の値
+ENTRY_IN = 0
+ENTRY_OUT = 1
+
+# 取引タイプ（TradeDeal.type）の表示名
+DEAL_TYPE_NAMES = {
+    0: 'BUY',
+    1: 'SELL',
+    2: 'BALANCE',
+    3: 'CREDIT',
+    4: 'CHARGE',
+    5: 'CORRECTION',
+    6: 'BONUS',
+    7: 'COMMISSION',
+    8: 'COMMISSION_DAILY',
+    9: 'COMMISSION_MONTHLY',
+    10: 'AGENT_DAILY',
+    11: 'AGENT_MONTHLY',
+    12: 'INTERESTRATE',
+    13: 'BUY_CANCELED',
+    14: 'SELL_CANCELED',
+    15: 'DIVIDEND',
+    16: 'DIVIDEND_FRANKED',
+    17: 'TAX'
+}
+
+# エントリータイプ（TradeDeal.entry）の表示名
+ENTRY_TYPE_NAMES = {
+    0: 'IN',
+    1: 'OUT',
+    2: 'INOUT',
+    3: 'OUT_BY'
+}
+
+# 取得した取引履歴を使い回す時間の単位（秒）。同じ日数・同じ時間枠内の取得はMT5に問い合わせない
+DEALS_CACHE_SECONDS = 60
+
+
 class MT5Connector:
     """MT5との接続を管理し、取引履歴を取得するクラス"""
     
@@ -18,6 +60,8 @@ class MT5Connector:
         self.password = password
         self.server = server
         self.connected = False
+        # 取引履歴のキャッシュ {(日数, 時間枠): 取引のタプル}
+        self._deals_cache = {}
     
     def connect(self) -> bool:
         """MT5に接続"""
@@ -45,21 +89,29 @@ class MT5Connector:
         if self.connected:
             mt5.shutdown()
             self.connected = False
+            self._deals_cache.clear()
             print("MT5から切断しました")
     
-    def get_deals(self, days: int = 7) -> List[Dict]:
+    def _fetch_deals(self, days: int) -> tuple:
         """
-        指定期間の取引履歴を取得
+        指定期間の取引履歴をMT5の名前付きタプルのまま取得（辞書への変換は呼び出し側で必要な分だけ行う）
+        
+        get_dealsとget_closed_positionsを続けて呼んだ場合などは、
+        DEALS_CACHE_SECONDS秒単位の時間枠内であれば前回の取得結果を使い回す
         
         Args:
-            days: 過去何日分の取引を取得するか（デフォルト: 7日）
+            days: 過去何日分の取引を取得するか
         
         Returns:
-            取引データのリスト
+            取引（TradeDeal）のタプル。取得できない場合は空のタプル
         """
         if not self.connected:
             raise ConnectionError("MT5に接続されていません")
         
+        cache_key = (days, int(time.time()) // DEALS_CACHE_SECONDS)
+        if cache_key in self._deals_cache:
+            return self._deals_cache[cache_key]
+        
         # 日付範囲の設定
         date_to = datetime.now()
         date_from = date_to - timedelta(days=days)
@@ -69,34 +121,51 @@ class MT5Connector:
         
         if deals is None:
             print(f"取引履歴の取得エラー: {mt5.last_error()}")
-            return []
+            return ()
         
         if len(deals) == 0:
             print("取引履歴が見つかりませんでした")
+            return ()
+        
+        print(f"{len(deals)}件の取引を取得しました")
+        # 古い時間枠の結果は使われないので捨ててから保存する
+        self._deals_cache = {key: value for key, value in self._deals_cache.items() if key[1] == cache_key[1]}
+        self._deals_cache[cache_key] = deals
+        return deals
+    
+    def get_deals(self, days: int = 7) -> List[Dict]:
+        """
+        指定期間の取引履歴を取得
+        
+        Args:
+            days: 過去何日分の取引を取得するか（デフォルト: 7日）
+        
+        Returns:
+            取引データのリスト
+        """
+        deals = self._fetch_deals(days)
+        if not deals:
             return []
         
-        # データを辞書形式に変換
-        deals_list = []
-        for deal in deals:
-            deal_dict = {
-                'ticket': deal.ticket,
-                'order': deal.order,
-                'time': datetime.fromtimestamp(deal.time),
-                'type': self._get_deal_type_name(deal.type),
-                'entry': self._get_entry_type_name(deal.entry),
-                'symbol': deal.symbol,
-                'volume': deal.volume,
-                'price': deal.price,
-                'commission': deal.commission,
-                'swap': deal.swap,
-                'profit': deal.profit,
-                'fee': deal.fee,
-                'comment': deal.comment
-            }
-            deals_list.append(deal_dict)
-        
-        print(f"{len(deals_list)}件の取引を取得しました")
-        return deals_list
+        # 時刻や種類の変換は1件ずつではなく列ごとにまとめて行い、辞書にするのは最後だけ
+        df = self._deals_frame(deals)
+        columns = {
+            'ticket': df['ticket'].tolist(),
+            'order': df['order'].tolist(),
+            'time': self._to_local_datetimes(df['time']),
+            'type': self._map_names(df['type'], DEAL_TYPE_NAMES),
+            'entry': self._map_names(df['entry'], ENTRY_TYPE_NAMES),
+            'symbol': df['symbol'].tolist(),
+            'volume': df['volume'].tolist(),
+            'price': df['price'].tolist(),
+            'commission': df['commission'].tolist(),
+            'swap': df['swap'].tolist(),
+            'profit': df['profit'].tolist(),
+            'fee': df['fee'].tolist(),
+            'comment': df['comment'].tolist()
+        }
+        keys = list(columns)
+        return [dict(zip(keys, values)) for values in zip(*columns.values())]
     
     def get_closed_positions(self, days: int = 7) -> List[Dict]:
         """
@@ -108,88 +177,70 @@ class MT5Connector:
         Returns:
             決済済みポジションのリスト
         """
-        deals = self.get_deals(days)
-        
-        # ポジションをグループ化
-        positions = {}
-        
-        for deal in deals:
-            order = deal['order']
-            
-            if order not in positions:
-                positions[order] = {
-                    'order': order,
-                    'symbol': deal['symbol'],
-                    'entry_deal': None,
-                    'exit_deal': None
-                }
-            
-            # エントリー（IN）とクローズ（OUT）を分類
-            if deal['entry'] == 'IN':
-                positions[order]['entry_deal'] = deal
-            elif deal['entry'] == 'OUT':
-                positions[order]['exit_deal'] = deal
-        
-        # エントリーとクローズが両方あるもののみを抽出
-        closed_positions = []
-        for pos in positions.values():
-            if pos['entry_deal'] and pos['exit_deal']:
-                entry = pos['entry_deal']
-                exit_deal = pos['exit_deal']
-                
-                closed_position = {
-                    'ticket': pos['order'],
-                    'symbol': pos['symbol'],
-                    'type': entry['type'],
-                    'volume': entry['volume'],
-                    'open_time': entry['time'],
-                    'close_time': exit_deal['time'],
-                    'open_price': entry['price'],
-                    'close_price': exit_deal['price'],
-                    'commission': entry['commission'] + exit_deal['commission'],
-                    'swap': entry['swap'] + exit_deal['swap'],
-                    'profit': exit_deal['profit']
-                }
-                closed_positions.append(closed_position)
+        deals = self._fetch_deals(days)
+        if not deals:
+            print("0件の決済済みポジションを取得しました")
+            return []
+        
+        df = self._deals_frame(deals)
+        
+        # 注文ごとにエントリー（IN）とクローズ（OUT）を1件ずつ取り出す（同じ注文に複数ある場合は後のものを使う）
+        entries = df[df['entry'] == ENTRY_IN].drop_duplicates('order', keep='last')
+        exits = df[df['entry'] == ENTRY_OUT].drop_duplicates('order', keep='last')
+        
+        # エントリーとクローズが両方あるもののみを抽出し、注文が最初に現れた順に並べる
+        pairs = entries.merge(exits, on='order', suffixes=('_in', '_out'))
+        first_seen = pd.Index(pd.unique(df['order']))
+        pairs = pairs.iloc[np.argsort(first_seen.get_indexer(pairs['order']), kind='stable')]
+        
+        columns = {
+            'ticket': pairs['order'].tolist(),
+            'symbol': pairs['symbol_in'].tolist(),
+            'type': self._map_names(pairs['type_in'], DEAL_TYPE_NAMES),
+            'volume': pairs['volume_in'].tolist(),
+            'open_time': self._to_local_datetimes(pairs['time_in']),
+            'close_time': self._to_local_datetimes(pairs['time_out']),
+            'open_price': pairs['price_in'].tolist(),
+            'close_price': pairs['price_out'].tolist(),
+            'commission': (pairs['commission_in'] + pairs['commission_out']).tolist(),
+            'swap': (pairs['swap_in'] + pairs['swap_out']).tolist(),
+            'profit': pairs['profit_out'].tolist()
+        }
+        keys = list(columns)
+        closed_positions = [dict(zip(keys, values)) for values in zip(*columns.values())]
         
         print(f"{len(closed_positions)}件の決済済みポジションを取得しました")
         return closed_positions
     
+    @staticmethod
+    def _deals_frame(deals: tuple) -> pd.DataFrame:
+        """MT5の取引（名前付きタプル）をまとめてDataFrameに変換"""
+        return pd.DataFrame(list(deals), columns=list(deals[0]._asdict()))
+    
+    @staticmethod
+    def _to_local_datetimes(seconds: pd.Series) -> List[datetime]:
+        """UNIX秒の列をローカル時刻のdatetimeのリストに変換（datetime.fromtimestampの列版）"""
+        times = pd.to_datetime(seconds, unit='s', utc=True).dt.tz_convert(tzlocal()).dt.tz_localize(None)
+        return list(pd.DatetimeIndex(times).to_pydatetime())
+    
+    @staticmethod
+    def _map_names(codes: pd.Series, names: Dict[int, str]) -> List[str]:
+        """種類を表す整数の列を表示名のリストに変換（未知の値は UNKNOWN(値)）"""
+        mapped = codes.map(names)
+        unknown = mapped.isna()
+        if unknown.any():
+            mapped[unknown] = 'UNKNOWN(' + codes[unknown].astype(str) + ')'
+        return mapped.tolist()
+    
     @staticmethod
     def _get_deal_type_name(deal_type: int) -> str:
         """取引タイプを文字列に変換"""
-        types = {
-            0: 'BUY',
-            1: 'SELL',
-            2: 'BALANCE',
-            3: 'CREDIT',
-            4: 'CHARGE',
-            5: 'CORRECTION',
-            6: 'BONUS',
-            7: 'COMMISSION',
-            8: 'COMMISSION_DAILY',
-            9: 'COMMISSION_MONTHLY',
-            10: 'AGENT_DAILY',
-            11: 'AGENT_MONTHLY',
-            12: 'INTERESTRATE',
-            13: 'BUY_CANCELED',
-            14: 'SELL_CANCELED',
-            15: 'DIVIDEND',
-            16: 'DIVIDEND_FRANKED',
-            17: 'TAX'
-        }
-        return types.get(deal_type, f'UNKNOWN({deal_type})')
+        return DEAL_TYPE_NAMES.get(deal_type, f'UNKNOWN({deal_type})')
     
     @staticmethod
     def _get_entry_type_name(entry: int) -> str:
         """エントリータイプを文字列に変換"""
-        types = {
-            0: 'IN',
-            1: 'OUT',
-            2: 'INOUT',
-            3: 'OUT_BY'
-        }
-        return types.get(entry, f'UNKNOWN({entry})')
+        return ENTRY_TYPE_NAMES.get(entry, f'UNKNOWN({entry})')
 
 
 # テスト実行用
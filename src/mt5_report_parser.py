@@ -1,11 +1,66 @@
 """MT5レポートファイル（HTML/CSV）パーサー"""
+import codecs
 import re
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict
-from bs4 import BeautifulSoup
+from typing import List, Dict, Optional
+from bs4 import BeautifulSoup, FeatureNotFound
 import os
 
+try:
+    import lxml.etree
+    # lxmlが使える場合はCで実装されたパーサーでHTMLを解析する（大きなレポートで数倍速い）
+    HTML_PARSER = 'lxml'
+except ImportError:
+    # lxmlは任意依存（未インストール時は標準のhtml.parserを使う）
+    lxml = None
+    HTML_PARSER = 'html.parser'
+
+# 数値の前処理に使う正規表現（行ごとにパターンを引き直さないよう事前にコンパイル）
+FLOAT_CLEAN_PATTERN = re.compile(r'[,\s]')
+NON_DIGIT_PATTERN = re.compile(r'[^\d]')
+
+# 日時文字列として受け付けるフォーマット（上から順に試す）
+DATETIME_FORMATS = [
+    '%Y.%m.%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y.%m.%d %H:%M',
+    '%Y-%m-%d %H:%M',
+    '%d.%m.%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+]
+
+# CSVの各項目に対応する列名の候補（上から順に、値が入っている最初の列を使う）
+CSV_COLUMN_CANDIDATES = {
+    'ticket': ['Order', 'Ticket', 'チケット', 'Deal'],
+    'symbol': ['Symbol', 'シンボル'],
+    'type': ['Type', 'タイプ'],
+    'volume': ['Volume', 'ロット'],
+    'open_time': ['Time', 'Open Time'],
+    'close_time': ['Time', 'Close Time'],
+    'open_price': ['Price', 'Open Price'],
+    'close_price': ['Price', 'Close Price'],
+    'commission': ['Commission', '手数料'],
+    'swap': ['Swap', 'スワップ'],
+    'profit': ['Profit', '損益'],
+}
+CSV_FLOAT_FIELDS = ['volume', 'open_price', 'close_price', 'commission', 'swap', 'profit']
+
+# HTMLレポートのエンコーディング候補（上から順に試す）
+HTML_ENCODINGS = ['utf-8', 'utf-16', 'shift-jis', 'cp1252', 'latin-1']
+
+# 判別済みのエンコーディング {(パス, 更新時刻, サイズ): エンコーディング}
+_detected_encodings = {}
+
+# 行の解析エラーを個別に表示する最大件数（それ以降は件数のみまとめて表示）
+MAX_ROW_ERROR_LOGS = 10
+
+# ポジション一覧セクションの開始・終了を示す見出し
+POSITIONS_SECTION_TITLES = ('ポジション一覧', 'Closed Trades')
+NEXT_SECTION_TITLES = ('注文', 'Orders', '約定', 'Deals')
+
 
 class MT5ReportParser:
     """MT5のレポートファイルから取引データを抽出するクラス"""
@@ -25,61 +80,56 @@ class MT5ReportParser:
             取引データのリスト（決済済み取引のみ）
         """
         try:
-            # 複数のエンコーディングを試行
-            encodings = ['utf-8', 'utf-16', 'shift-jis', 'cp1252', 'latin-1']
-            html_content = None
-            
-            for encoding in encodings:
+            # ポジション一覧セクションのデータ行（hiddenを除いたセルの文字列のリスト）を取り出す
+            position_rows = None
+            if lxml is not None:
+                # lxmlではファイルを先頭から順に解析し、処理済みの行は捨てる（文書全体をメモリに持たない）
+                encoding = MT5ReportParser._detect_encoding(file_path, HTML_ENCODINGS)
+                if encoding is None:
+                    raise ValueError("ファイルのエンコーディングを判別できませんでした")
                 try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        html_content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
+                    position_rows = MT5ReportParser._position_rows_lxml(file_path, encoding)
+                except (ValueError, lxml.etree.LxmlError):
+                    # lxmlで解析できない場合はBeautifulSoupで解析する
+                    position_rows = None
+            if position_rows is None:
+                html_content = MT5ReportParser._read_text(file_path, HTML_ENCODINGS)
+                if html_content is None:
+                    raise ValueError("ファイルのエンコーディングを判別できませんでした")
+                position_rows = MT5ReportParser._position_rows_bs4(html_content)
             
-            if html_content is None:
-                raise ValueError("ファイルのエンコーディングを判別できませんでした")
+            rows = [cols for cols in position_rows if len(cols) >= 13]  # 決済済み取引の最低限のカラム数
             
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # 開始・終了時刻は1行ずつstrptimeせず、全行分を列としてまとめて変換しておく
+            open_times = MT5ReportParser._parse_datetime_column(pd.Series([cols[0] for cols in rows], dtype=object))
+            close_times = MT5ReportParser._parse_datetime_column(pd.Series([cols[8] for cols in rows], dtype=object))
             
-            # 取引テーブルを探す（bgcolorがある行がデータ行）
-            tables = soup.find_all('table')
             trades = []
+            error_count = 0
+            for cols, open_time, close_time in zip(rows, open_times, close_times):
+                try:
+                    trade = MT5ReportParser._parse_html_trade_row(cols, open_time, close_time)
+                    if trade:
+                        trades.append(trade)
+                except Exception as e:
+                    # 壊れたレポートで大量に失敗した場合に備え、表示は先頭の数件だけにする
+                    error_count += 1
+                    if error_count <= MAX_ROW_ERROR_LOGS:
+                        print(f"行の解析エラー: {e}, データ: {cols[:5]}")
+                    continue
+            if error_count > MAX_ROW_ERROR_LOGS:
+                print(f"行の解析エラー: 他 {error_count - MAX_ROW_ERROR_LOGS} 件の表示を省略しました（合計 {error_count} 件）")
             
-            for table in tables:
-                # テーブル内の全tr要素を順番に処理
-                all_rows = table.find_all('tr')
-                in_positions_section = False
-                
-                for row in all_rows:
-                    # セクションヘッダーをチェック
-                    headers = row.find_all('th', attrs={'colspan': True})
-                    for header in headers:
-                        text = header.get_text(strip=True)
-                        if 'ポジション一覧' in text or 'Closed Trades' in text:
-                            in_positions_section = True
-                        elif in_positions_section and ('注文' in text or 'Orders' in text or '約定' in text or 'Deals' in text):
-                            # 次のセクションに入ったら終了
-                            in_positions_section = False
-                    
-                    # ポジション一覧セクション内のデータ行のみ処理
-                    if in_positions_section and row.get('bgcolor'):
-                        # hiddenクラスの要素を除外してデータを取得
-                        tds = row.find_all('td')
-                        cols = []
-                        for td in tds:
-                            # hiddenクラスを持つ要素はスキップ
-                            if 'hidden' not in td.get('class', []):
-                                cols.append(td.get_text(strip=True))
-                        
-                        if len(cols) >= 13:  # 決済済み取引の最低限のカラム数
-                            try:
-                                trade = MT5ReportParser._parse_html_trade_row(cols)
-                                if trade:
-                                    trades.append(trade)
-                            except Exception as e:
-                                print(f"行の解析エラー: {e}, データ: {cols[:5]}")
-                                continue
+            # pipsは1行ずつではなく、全取引分をまとめて計算する
+            if trades:
+                pips = MT5ReportParser._calculate_pips_column(
+                    pd.Series([trade['symbol'] for trade in trades], dtype=object),
+                    pd.Series([trade['open_price'] for trade in trades], dtype=np.float64),
+                    pd.Series([trade['close_price'] for trade in trades], dtype=np.float64),
+                    pd.Series([trade['type'] for trade in trades], dtype=object)
+                )
+                for trade, value in zip(trades, pips.tolist()):
+                    trade['pips'] = value
             
             print(f"HTMLレポートから {len(trades)} 件の取引を抽出しました")
             return trades
@@ -88,6 +138,148 @@ class MT5ReportParser:
             print(f"HTMLレポートの読み込みエラー: {e}")
             return []
     
+    @staticmethod
+    def _encoding_cache_key(file_path: str) -> tuple:
+        """判別済みエンコーディングのキャッシュのキー (パス, 更新時刻, サイズ)"""
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    
+    @staticmethod
+    def _detect_encoding(file_path: str, encodings: List[str], chunk_size: int = 1 << 20) -> Optional[str]:
+        """
+        ファイル全体を読み込まずにエンコーディングを判別する（候補ごとに少しずつ読み進めてデコードを試す）
+        
+        Returns:
+            デコードできた最初の候補。どの候補でもデコードできない場合はNone
+        """
+        cache_key = MT5ReportParser._encoding_cache_key(file_path)
+        known = _detected_encodings.get(cache_key)
+        if known:
+            return known
+        
+        for encoding in encodings:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                with open(file_path, 'rb') as f:
+                    while True:
+                        chunk = f.read(chunk_size)
+                        decoder.decode(chunk, final=not chunk)
+                        if not chunk:
+                            break
+            except UnicodeDecodeError:
+                continue
+            _detected_encodings[cache_key] = encoding
+            return encoding
+        return None
+    
+    @staticmethod
+    def _read_text(file_path: str, encodings: List[str]):
+        """
+        ファイルを一度だけバイト列で読み込み、エンコーディング候補を順にメモリ上でデコードする
+        
+        判別できたエンコーディングはファイルの更新時刻・サイズとともに覚えておき、
+        同じファイルを再度読む場合は最初にそれを試す
+        
+        Returns:
+            デコードした文字列。どの候補でもデコードできない場合はNone
+        """
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        cache_key = MT5ReportParser._encoding_cache_key(file_path)
+        known = _detected_encodings.get(cache_key)
+        candidates = [known] + [enc for enc in encodings if enc != known] if known else encodings
+        
+        for encoding in candidates:
+            try:
+                text = raw.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            _detected_encodings[cache_key] = encoding
+            # テキストモードで読んだ場合と同じく改行を\nにそろえる
+            return text.replace('\r\n', '\n').replace('\r', '\n')
+        return None
+    
+    @staticmethod
+    def _section_state(header_texts: List[str], in_positions_section: bool) -> bool:
+        """行内のセクション見出しから、ポジション一覧セクション内かどうかを更新する"""
+        for text in header_texts:
+            if any(title in text for title in POSITIONS_SECTION_TITLES):
+                in_positions_section = True
+            elif in_positions_section and any(title in text for title in NEXT_SECTION_TITLES):
+                # 次のセクションに入ったら終了
+                in_positions_section = False
+        return in_positions_section
+    
+    @staticmethod
+    def _position_rows_lxml(file_path: str, encoding: str) -> List[List[str]]:
+        """
+        lxmlのiterparseでポジション一覧セクションのデータ行を取り出す
+        
+        <tr>の終了ごとに1行ずつ処理し、処理済みの行は木から取り除くため、
+        メモリ使用量はレポートの大きさによらず1行分程度になる
+        """
+        rows = []
+        # テーブルごとの「ポジション一覧セクション内か」（入れ子のテーブルに備えてスタックで持つ）
+        section_states = []
+        events = lxml.etree.iterparse(
+            file_path, events=('start', 'end'), tag=('table', 'tr'), html=True, encoding=encoding
+        )
+        for event, element in events:
+            if element.tag == 'table':
+                if event == 'start':
+                    section_states.append(False)
+                elif section_states:
+                    section_states.pop()
+                continue
+            if event != 'end' or not section_states:
+                continue
+            
+            # セクションヘッダーをチェック（get_text(strip=True)と同じく各テキストを除去してつなげる）
+            headers = [''.join(t.strip() for t in th.itertext()) for th in element.iterfind('.//th[@colspan]')]
+            if headers:
+                section_states[-1] = MT5ReportParser._section_state(headers, section_states[-1])
+            
+            # ポジション一覧セクション内のデータ行のみ処理（hiddenクラスのセルは除外）
+            if section_states[-1] and element.get('bgcolor'):
+                rows.append([
+                    ''.join(t.strip() for t in td.itertext()) for td in element.iter('td')
+                    if 'hidden' not in (td.get('class') or '').split()
+                ])
+            
+            # 処理済みの行と、それより前の兄弟要素を解放
+            element.clear()
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+        return rows
+    
+    @staticmethod
+    def _position_rows_bs4(html_content: str) -> List[List[str]]:
+        """BeautifulSoupでポジション一覧セクションのデータ行を取り出す（lxmlがない場合）"""
+        try:
+            soup = BeautifulSoup(html_content, HTML_PARSER)
+        except FeatureNotFound:
+            soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # 取引テーブルを探す（bgcolorがある行がデータ行）
+        rows = []
+        for table in soup.find_all('table'):
+            # テーブル内の全tr要素を順番に処理
+            in_positions_section = False
+            for row in table.find_all('tr'):
+                # セクションヘッダーをチェック
+                headers = [header.get_text(strip=True) for header in row.find_all('th', attrs={'colspan': True})]
+                in_positions_section = MT5ReportParser._section_state(headers, in_positions_section)
+                
+                # ポジション一覧セクション内のデータ行のみ処理
+                if in_positions_section and row.get('bgcolor'):
+                    # hiddenクラスの要素を除外してデータを取得
+                    rows.append([
+                        td.get_text(strip=True) for td in row.find_all('td')
+                        if 'hidden' not in td.get('class', [])
+                    ])
+        return rows
+    
     @staticmethod
     def parse_csv_report(file_path: str) -> List[Dict]:
         """
@@ -114,19 +306,42 @@ class MT5ReportParser:
             if df is None:
                 raise ValueError("CSVファイルを読み込めませんでした")
             
-            trades = []
-            
             # カラム名を正規化
             df.columns = df.columns.str.strip()
             
-            for _, row in df.iterrows():
-                try:
-                    trade = MT5ReportParser._parse_csv_row(row)
-                    if trade:
-                        trades.append(trade)
-                except Exception as e:
-                    print(f"行の解析エラー: {e}")
-                    continue
+            # 列名の候補はここで一度だけCSVの列と突き合わせておく（項目 → 実在する列名のリスト）
+            resolved = {
+                field: [key for key in keys if key in df.columns]
+                for field, keys in CSV_COLUMN_CANDIDATES.items()
+            }
+            missing = [field for field, keys in resolved.items() if not keys]
+            if missing:
+                print(f"CSVに対応する列がない項目: {', '.join(missing)}")
+            
+            # 行ごとのループは行わず、項目ごとに列単位で変換する
+            values = {field: MT5ReportParser._csv_column(df, keys) for field, keys in resolved.items()}
+            
+            # 取引番号が整数として読めない行は取引ではないので除外
+            ticket_valid = values['ticket'].str.fullmatch(r'[+-]?\d+')
+            parsed = pd.DataFrame({
+                'ticket': pd.to_numeric(values['ticket'].where(ticket_valid, '0')).astype('int64'),
+                'symbol': values['symbol'],
+                'type': values['type'],
+            })
+            for field in CSV_FLOAT_FIELDS:
+                parsed[field] = MT5ReportParser._parse_float_column(values[field])
+            parsed['open_time'] = MT5ReportParser._parse_datetime_column(values['open_time'])
+            parsed['close_time'] = MT5ReportParser._parse_datetime_column(values['close_time'])
+            
+            # pipsを計算
+            parsed['pips'] = MT5ReportParser._calculate_pips_column(
+                parsed['symbol'], parsed['open_price'], parsed['close_price'], parsed['type']
+            )
+            
+            keep = ticket_valid & parsed['ticket'].ne(0) & parsed['symbol'].ne('')
+            columns = ['ticket', 'symbol', 'type', 'volume', 'open_time', 'close_time',
+                       'open_price', 'close_price', 'commission', 'swap', 'profit', 'pips']
+            trades = parsed.loc[keep, columns].to_dict('records')
             
             print(f"CSVレポートから {len(trades)} 件の取引を抽出しました")
             return trades
@@ -136,7 +351,8 @@ class MT5ReportParser:
             return []
     
     @staticmethod
-    def _parse_html_trade_row(cols: List[str]) -> Dict:
+    def _parse_html_trade_row(cols: List[str], open_time: Optional[datetime] = None,
+                              close_time: Optional[datetime] = None) -> Dict:
         """
         HTMLテーブルの行から取引データを抽出
         
@@ -144,43 +360,45 @@ class MT5ReportParser:
         [0] 開始時刻, [1] チケット, [2] シンボル, [3] タイプ, [4] ロット,
         [5] 開始価格, [6] S/L, [7] T/P, [8] 終了時刻, [9] 終了価格,
         [10] 手数料, [11] スワップ, [12] 損益
+        
+        open_time / close_time に変換済みの日時を渡した場合は [0] / [8] の解析を省略する
         """
         try:
             # 基本的な検証
             if len(cols) < 13:
                 return None
             
+            # 固定の13カラムを一度に展開する（S/L・T/Pは使わない）
+            (open_str, ticket_str, symbol, type_str, volume_str, open_price_str, _sl, _tp,
+             close_str, close_price_str, commission_str, swap_str, profit_str) = cols[:13]
+            
             # buy/sellが含まれているか確認（取引行の識別）
-            type_str = cols[3].lower()
-            if type_str not in ['buy', 'sell']:
+            type_str = type_str.lower()
+            if type_str not in ('buy', 'sell'):
                 return None
             
-            open_time = MT5ReportParser._parse_datetime(cols[0])
-            close_time = MT5ReportParser._parse_datetime(cols[8])
+            # 開始・終了時刻が変換済みで渡されない場合はここで変換する
+            if open_time is None:
+                open_time = MT5ReportParser._parse_datetime(open_str)
+            if close_time is None:
+                close_time = MT5ReportParser._parse_datetime(close_str)
             
+            parse_float = MT5ReportParser._parse_float
             trade = {
-                'ticket': int(re.sub(r'[^\d]', '', cols[1])),
-                'symbol': cols[2],
+                'ticket': int(NON_DIGIT_PATTERN.sub('', ticket_str)),
+                'symbol': symbol,
                 'type': type_str,
-                'volume': MT5ReportParser._parse_float(cols[4]),
+                'volume': parse_float(volume_str),
                 'open_time': open_time,
                 'close_time': close_time,
-                'open_price': MT5ReportParser._parse_float(cols[5]),
-                'close_price': MT5ReportParser._parse_float(cols[9]),
-                'commission': MT5ReportParser._parse_float(cols[10]),
-                'swap': MT5ReportParser._parse_float(cols[11]),
-                'profit': MT5ReportParser._parse_float(cols[12]),
+                'open_price': parse_float(open_price_str),
+                'close_price': parse_float(close_price_str),
+                'commission': parse_float(commission_str),
+                'swap': parse_float(swap_str),
+                'profit': parse_float(profit_str),
             }
             
-            # pipsを計算
-            trade['pips'] = MT5ReportParser._calculate_pips(
-                trade['symbol'],
-                trade['open_price'],
-                trade['close_price'],
-                trade['type']
-            )
-            
-            # 保有時間（秒）を計算
+            # 保有時間（秒）を計算（pipsは全行の抽出後にparse_html_reportでまとめて計算する）
             trade['holding_time'] = int((close_time - open_time).total_seconds())
             
             return trade if trade['ticket'] and trade['symbol'] else None
@@ -199,7 +417,7 @@ class MT5ReportParser:
         ticket = None
         for key in ['Order', 'Ticket', 'チケット', '注文']:
             if key in data:
-                ticket = int(re.sub(r'[^\d]', '', data[key]))
+                ticket = int(NON_DIGIT_PATTERN.sub('', data[key]))
                 break
         
         if not ticket:
@@ -246,56 +464,70 @@ class MT5ReportParser:
         return trade if all([trade['ticket'], trade['symbol']]) else None
     
     @staticmethod
-    def _parse_csv_row(row: pd.Series) -> Dict:
-        """CSVの行から取引データを抽出"""
-        try:
-            trade = {
-                'ticket': int(MT5ReportParser._find_value(
-                    row.to_dict(), ['Order', 'Ticket', 'チケット', 'Deal']
-                )),
-                'symbol': MT5ReportParser._find_value(
-                    row.to_dict(), ['Symbol', 'シンボル']
-                ),
-                'type': MT5ReportParser._find_value(
-                    row.to_dict(), ['Type', 'タイプ']
-                ),
-                'volume': MT5ReportParser._parse_float(
-                    MT5ReportParser._find_value(row.to_dict(), ['Volume', 'ロット'])
-                ),
-                'open_time': MT5ReportParser._parse_datetime(
-                    MT5ReportParser._find_value(row.to_dict(), ['Time', 'Open Time'])
-                ),
-                'close_time': MT5ReportParser._parse_datetime(
-                    MT5ReportParser._find_value(row.to_dict(), ['Time', 'Close Time'])
-                ),
-                'open_price': MT5ReportParser._parse_float(
-                    MT5ReportParser._find_value(row.to_dict(), ['Price', 'Open Price'])
-                ),
-                'close_price': MT5ReportParser._parse_float(
-                    MT5ReportParser._find_value(row.to_dict(), ['Price', 'Close Price'])
-                ),
-                'commission': MT5ReportParser._parse_float(
-                    MT5ReportParser._find_value(row.to_dict(), ['Commission', '手数料'])
-                ),
-                'swap': MT5ReportParser._parse_float(
-                    MT5ReportParser._find_value(row.to_dict(), ['Swap', 'スワップ'])
-                ),
-                'profit': MT5ReportParser._parse_float(
-                    MT5ReportParser._find_value(row.to_dict(), ['Profit', '損益'])
-                ),
-            }
-            
-            # pipsを計算
-            trade['pips'] = MT5ReportParser._calculate_pips(
-                trade['symbol'],
-                trade['open_price'],
-                trade['close_price'],
-                trade['type']
-            )
-            
-            return trade if trade['ticket'] and trade['symbol'] else None
-        except:
-            return None
+    def _csv_column(df: pd.DataFrame, keys: List[str]) -> pd.Series:
+        """
+        複数の列名候補から値を集めた文字列の列を返す（_find_valueの列版）
+        
+        行ごとに、候補の順で空でも'nan'でもない最初の値を使い、見つからない行は空文字にする
+        
+        Args:
+            df: CSVのDataFrame
+            keys: dfに実在する列名の候補（優先順）
+        """
+        result = pd.Series('', index=df.index, dtype=object)
+        found = pd.Series(False, index=df.index)
+        for key in keys:
+            column = df[key].astype(str).str.strip()
+            usable = ~found & column.ne('') & column.ne('nan')
+            result = result.mask(usable, column)
+            found |= usable
+        return result
+    
+    @staticmethod
+    def _parse_float_column(values: pd.Series) -> pd.Series:
+        """文字列の列をfloatに変換（_parse_floatの列版。変換できない値は0.0）"""
+        cleaned = values.str.replace(FLOAT_CLEAN_PATTERN, '', regex=True)
+        return pd.to_numeric(cleaned, errors='coerce').fillna(0.0).astype(np.float64)
+    
+    @staticmethod
+    def _parse_datetime_column(values: pd.Series) -> pd.Series:
+        """
+        文字列の列をdatetimeに変換（_parse_datetimeの列版。日本時間として扱う）
+        
+        空の値は現在時刻、どのフォーマットにも合わない値は日本時間の現在時刻にする
+        """
+        jst = timezone(timedelta(hours=9))
+        stripped = values.str.strip()
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        for fmt in DATETIME_FORMATS:
+            remaining = parsed.isna() & stripped.ne('')
+            if not remaining.any():
+                break
+            parsed[remaining] = pd.to_datetime(stripped[remaining], format=fmt, errors='coerce')
+        
+        result = pd.DatetimeIndex(parsed).tz_localize(jst).to_pydatetime()
+        empty = values.eq('').to_numpy()
+        unparsed = parsed.isna().to_numpy() & ~empty
+        if empty.any():
+            result[empty] = datetime.now()
+        if unparsed.any():
+            result[unparsed] = datetime.now(jst)
+        return pd.Series(result, index=values.index, dtype=object)
+    
+    @staticmethod
+    def _calculate_pips_column(symbols: pd.Series, open_prices: pd.Series,
+                               close_prices: pd.Series, trade_types: pd.Series) -> pd.Series:
+        """pips数を列単位で計算（_calculate_pipsの列版）"""
+        open_arr = open_prices.to_numpy(dtype=np.float64)
+        close_arr = close_prices.to_numpy(dtype=np.float64)
+        # SELLの場合は符号を反転
+        sign = np.where(trade_types.str.upper().str.contains('SELL', regex=False).to_numpy(dtype=bool), -1.0, 1.0)
+        # JPYペアは小数点第2位、その他は小数点第4位がpips
+        scale = np.where(symbols.str.upper().str.contains('JPY', regex=False).to_numpy(dtype=bool), 100.0, 10000.0)
+        pips = np.round((close_arr - open_arr) * sign * scale, 2)
+        # 価格が0の取引はpipsを計算しない
+        pips[(open_arr == 0) | (close_arr == 0)] = 0.0
+        return pd.Series(pips, index=symbols.index)
     
     @staticmethod
     def _find_value(data: Dict, keys: List[str]) -> str:
@@ -314,7 +546,7 @@ class MT5ReportParser:
             return 0.0
         try:
             # カンマや空白を除去
-            cleaned = re.sub(r'[,\s]', '', str(value))
+            cleaned = FLOAT_CLEAN_PATTERN.sub('', value if isinstance(value, str) else str(value))
             return float(cleaned)
         except:
             return 0.0
@@ -363,24 +595,14 @@ class MT5ReportParser:
             jst = timezone(timedelta(hours=9))
             
             # 様々な日時フォーマットに対応
-            formats = [
-                '%Y.%m.%d %H:%M:%S',
-                '%Y-%m-%d %H:%M:%S',
-                '%Y/%m/%d %H:%M:%S',
-                '%Y.%m.%d %H:%M',
-                '%Y-%m-%d %H:%M',
-                '%d.%m.%Y %H:%M:%S',
-                '%d/%m/%Y %H:%M:%S',
-            ]
-            
-            for fmt in formats:
+            for fmt in DATETIME_FORMATS:
                 try:
                     # タイムゾーン情報なしでパース
                     dt = datetime.strptime(value.strip(), fmt)
-                    # 日本時間として扱う
-                    return dt.replace(tzinfo=jst)
-                except:
+                except ValueError:
                     continue
+                # 日本時間として扱う
+                return dt.replace(tzinfo=jst)
             
             return datetime.now(jst)
         except:
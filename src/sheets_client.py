@@ -1,8 +1,13 @@
 """Google Sheets APIクライアントモジュール"""
+import re
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+
+# Notionリンク付きの取引番号セルの数式 =HYPERLINK("URL", "取引番号")
+HYPERLINK_PATTERN = re.compile(r'^=HYPERLINK\("[^"]*",\s*"([^"]*)"\)$', re.IGNORECASE)
 
 
 class SheetsClient:
@@ -76,18 +81,45 @@ class SheetsClient:
         Returns:
             統計情報 (new: 新規追加数, existing: 既存数)
         """
+        stats, ticket_to_row = self.append_rows(trades)
+        if ticket_to_url:
+            self.patch_links(ticket_to_row, ticket_to_url)
+        return stats
+    
+    def append_rows(self, trades: List[Dict]) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        未登録の取引をNotionリンクなしでまとめて追加（リンクは後からpatch_linksで設定する）
+        
+        Notionへの同期と並行して実行できるよう、NotionページURLを必要としない部分だけを行う。
+        以前の実行でNotionへの同期に失敗するなどしてリンクが未設定のままの既存行も、
+        リンクの設定対象として戻り値に含める
+        
+        Args:
+            trades: 取引データのリスト
+        
+        Returns:
+            (統計情報 (new: 新規追加数, existing: 既存数), リンクを設定する取引番号 → 行番号 の辞書)
+        """
         stats = {'new': 0, 'existing': 0}
         
-        # 既存の取引番号を取得
-        existing_tickets = self.get_existing_tickets()
+        # 既存の取引番号を数式のまま取得（A列の件数から次の空行も求める）
+        tickets_column = self.sheet.col_values(1, value_render_option='FORMULA')
+        existing_tickets = set()
+        unlinked_rows = {}
+        for row, value in enumerate(tickets_column[1:], start=2):
+            ticket, linked = self._parse_ticket_cell(value)
+            if not ticket:
+                continue
+            existing_tickets.add(ticket)
+            if not linked:
+                unlinked_rows[ticket] = row
         
         print(f"スプレッドシートの既存取引: {len(existing_tickets)}件")
+        if unlinked_rows:
+            print(f"  Notionリンクが未設定の既存取引: {len(unlinked_rows)}件（リンクを補完します）")
         
-        # ticket_to_urlがnoneの場合は空の辞書を使用
-        if ticket_to_url is None:
-            ticket_to_url = {}
-        
-        # 各取引を処理
+        rows = []
+        new_tickets = []
         for trade in trades:
             ticket = str(trade['ticket'])
             
@@ -95,12 +127,70 @@ class SheetsClient:
                 print(f"  ⊘ 取引 {ticket} は既に存在します（スキップ）")
                 stats['existing'] += 1
             else:
-                # Notion URLがあれば渡す
-                notion_url = ticket_to_url.get(ticket)
-                if self.add_trade_row(trade, notion_url):
-                    stats['new'] += 1
+                rows.append(self._build_row(trade))
+                new_tickets.append(ticket)
+                # 同じレポート内の重複も1行にする
+                existing_tickets.add(ticket)
         
-        return stats
+        if not rows:
+            return stats, unlinked_rows
+        
+        # A列から明示的に範囲を指定して、新しい行を1回のリクエストで追加
+        first_row = len(tickets_column) + 1
+        last_row = first_row + len(rows) - 1
+        try:
+            self.sheet.update(f'A{first_row}:N{last_row}', rows, value_input_option='USER_ENTERED')
+        except Exception as e:
+            print(f"✗ スプレッドシートへの記録エラー: {e}")
+            return stats, unlinked_rows
+        
+        stats['new'] = len(rows)
+        print(f"✓ {len(rows)}件の取引をスプレッドシートに記録しました")
+        unlinked_rows.update((ticket, first_row + i) for i, ticket in enumerate(new_tickets))
+        return stats, unlinked_rows
+    
+    @staticmethod
+    def _parse_ticket_cell(value) -> Tuple[str, bool]:
+        """
+        取引番号セルの値（数式のまま取得したもの）から (取引番号, Notionリンクの有無) を取り出す
+        
+        空のセルは ('', False)
+        """
+        if value is None or value == '':
+            return '', False
+        text = str(value)
+        match = HYPERLINK_PATTERN.match(text)
+        if match:
+            return match.group(1), True
+        return text, False
+    
+    def patch_links(self, ticket_to_row: Dict[str, int], ticket_to_url: Dict[str, str]) -> int:
+        """
+        追加した行（とリンクが未設定の既存行）の取引番号セルにNotionページへのリンクをまとめて設定
+        
+        Args:
+            ticket_to_row: 取引番号 → 行番号 の辞書（append_rowsの戻り値）
+            ticket_to_url: 取引番号とNotionページURLのマッピング
+        
+        Returns:
+            リンクを設定した件数
+        """
+        updates = [
+            {'range': f'A{row}', 'values': [[f'=HYPERLINK("{ticket_to_url[ticket]}", "{ticket}")']]}
+            for ticket, row in ticket_to_row.items()
+            if ticket_to_url.get(ticket)
+        ]
+        if not updates:
+            return 0
+        
+        try:
+            self.sheet.batch_update(updates, value_input_option='USER_ENTERED')
+        except Exception as e:
+            print(f"✗ Notionリンクの設定エラー: {e}")
+            return 0
+        
+        print(f"✓ {len(updates)}件の取引にNotionリンクを設定しました")
+        return len(updates)
     
     def get_existing_tickets(self) -> List[str]:
         """
@@ -129,41 +219,9 @@ class SheetsClient:
             成功時True、失敗時False
         """
         try:
-            # 損益の計算（利益 + 手数料 + スワップ）
-            total_pnl = trade['profit'] + trade['commission'] + trade['swap']
-            
-            # 日付フォーマット
-            open_time_str = trade['open_time'].strftime('%Y-%m-%d %H:%M:%S')
-            close_time_str = trade['close_time'].strftime('%Y-%m-%d %H:%M:%S')
-            date_str = trade['open_time'].strftime('%Y-%m-%d')
-            sync_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
+            row_data = self._build_row(trade, notion_url)
             ticket_str = str(trade['ticket'])
             
-            # Notionリンクがある場合はHYPERLINK関数を使用
-            if notion_url:
-                ticket_cell_value = f'=HYPERLINK("{notion_url}", "{ticket_str}")'
-            else:
-                ticket_cell_value = ticket_str
-            
-            # 行データを作成
-            row_data = [
-                ticket_cell_value,              # 取引番号（リンク付き）
-                trade['symbol'],                # 通貨ペア
-                trade['type'],                  # タイプ
-                trade['volume'],                # ロット
-                open_time_str,                  # 開始時刻
-                close_time_str,                 # 終了時刻
-                date_str,                       # 日付
-                trade['profit'],                # 損益
-                trade.get('pips', 0.0),        # pips
-                trade.get('holding_time', 0),  # 保有時間
-                trade['commission'],            # 手数料
-                trade['swap'],                  # スワップ
-                total_pnl,                      # 合計損益
-                sync_time                       # 同期日時
-            ]
-            
             # 次の空行の行番号を取得（A列基準）
             next_row = len(self.sheet.col_values(1)) + 1
             # A列から明示的に範囲を指定して追加
@@ -181,6 +239,49 @@ class SheetsClient:
             print(f"✗ 取引 {trade['ticket']} の記録エラー: {e}")
             return False
     
+    def _build_row(self, trade: Dict, notion_url: Optional[str] = None) -> list:
+        """
+        取引データからスプレッドシートの1行分（A〜N列）の値を作成
+        
+        Args:
+            trade: 取引データ
+            notion_url: NotionページのURL（オプション）
+        """
+        # 損益の計算（利益 + 手数料 + スワップ）
+        total_pnl = trade['profit'] + trade['commission'] + trade['swap']
+        
+        # 日付フォーマット
+        open_time_str = trade['open_time'].strftime('%Y-%m-%d %H:%M:%S')
+        close_time_str = trade['close_time'].strftime('%Y-%m-%d %H:%M:%S')
+        date_str = trade['open_time'].strftime('%Y-%m-%d')
+        sync_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        ticket_str = str(trade['ticket'])
+        
+        # Notionリンクがある場合はHYPERLINK関数を使用
+        if notion_url:
+            ticket_cell_value = f'=HYPERLINK("{notion_url}", "{ticket_str}")'
+        else:
+            ticket_cell_value = ticket_str
+        
+        # 行データを作成
+        return [
+            ticket_cell_value,              # 取引番号（リンク付き）
+            trade['symbol'],                # 通貨ペア
+            trade['type'],                  # タイプ
+            trade['volume'],                # ロット
+            open_time_str,                  # 開始時刻
+            close_time_str,                 # 終了時刻
+            date_str,                       # 日付
+            trade['profit'],                # 損益
+            trade.get('pips', 0.0),        # pips
+            trade.get('holding_time', 0),  # 保有時間
+            trade['commission'],            # 手数料
+            trade['swap'],                  # スワップ
+            total_pnl,                      # 合計損益
+            sync_time                       # 同期日時
+        ]
+    
     def clear_all_data(self):
         """すべてのデータをクリア（ヘッダーは残す）"""
         try:
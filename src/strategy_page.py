@@ -1,10 +1,51 @@
 """手法管理ページ - 独立モジュール"""
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+from src.data_manager import TradeDataManager, TradeAnalyzer
 
+# st.plotly_chart に渡す共通設定（app.pyと共有し、描画ごとに辞書を作り直さない）
+PLOTLY_CONFIG = {'responsive': True, 'displaylogo': False}
 
-def strategy_management_page_new(load_data_func, get_strategy_manager_func):
+
+# 手法別トレード一覧の表示列
+STRATEGY_TRADE_DISPLAY_COLUMNS = ['trade_id', 'date', 'currency_pair', 'type', 'pips', 'net_profit_loss_jpy', 'review_comment']
+
+
+@st.cache_data(show_spinner=False)
+def strategy_trades_display(_df: pd.DataFrame, df_hash: int, strategy: str) -> pd.DataFrame:
+    """手法別トレード一覧の表示用DataFrame（新しい順。dfは読み込み時に計算した内容のハッシュで識別。キャッシュ付き）"""
+    strategy_trades = _df[_df['strategy'] == strategy].sort_values('date', ascending=False)
+    available_cols = [col for col in STRATEGY_TRADE_DISPLAY_COLUMNS if col in strategy_trades.columns]
+    return TradeDataManager.build_display_frame(strategy_trades, available_cols)
+
+
+# ランキング上位3件に付ける絵文字（4位以降は📊）
+RANK_EMOJIS = ['🥇', '🥈', '🥉']
+
+
+def ranking_markdown(lines) -> str:
+    """ランキングの各行に順位の絵文字を付け、1回のst.markdownで描画できる文字列にまとめる"""
+    return "\n\n".join(
+        f"{RANK_EMOJIS[i] if i < len(RANK_EMOJIS) else '📊'} {line}"
+        for i, line in enumerate(lines)
+    )
+
+
+def profit_bar_colors(values) -> np.ndarray:
+    """損益の符号で棒の色を決める（プラス=緑、マイナス=赤、ゼロ=灰色。連続カラースケールとカラーバーは使わない）"""
+    values = np.asarray(values, dtype=float)
+    return np.where(values > 0, 'green', np.where(values < 0, 'red', 'lightgray'))
+
+
+@st.cache_data(show_spinner=False)
+def _strategy_stats(_df: pd.DataFrame, df_hash: int) -> pd.DataFrame:
+    """手法別の分析（dfは読み込み時に計算した内容のハッシュで識別。キャッシュ付き）"""
+    return TradeAnalyzer(_df).analyze_by_strategy()
+
+
+def strategy_management_page_new(load_data_func, get_strategy_manager_func, invalidate_data_func):
     """手法管理ページ（新バージョン）"""
     st.title("📚 手法管理")
     
@@ -21,15 +62,9 @@ def strategy_management_page_new(load_data_func, get_strategy_manager_func):
             strategies_data = strategy_manager.load_all_strategies() or {}
             strategies = strategy_manager.get_strategy_list() or []
 
-            # Google Sheetsのプルダウンを更新（可能な場合のみ）
+            # Google Sheetsのプルダウンの更新を予約（描画のたびに書き込まず、まとめて反映する）
             if strategies and getattr(strategy_manager, 'sheets_manager', None):
-                try:
-                    if hasattr(strategy_manager.sheets_manager, 'update_strategy_dropdown'):
-                        strategy_manager.sheets_manager.update_strategy_dropdown(strategies)
-                    else:
-                        st.warning("Google Sheetsのプルダウン更新機能が利用できません。アプリを再起動してください。")
-                except Exception as e:
-                    st.warning(f"Google Sheetsのプルダウン更新に失敗しました: {e}")
+                strategy_manager.schedule_sheets_dropdown_update()
     except Exception as e:
         st.error(f"手法の読み込み中にエラーが発生しました: {e}")
     tab1, tab2, tab3 = st.tabs([
@@ -37,7 +72,7 @@ def strategy_management_page_new(load_data_func, get_strategy_manager_func):
     ])
     
     with tab1:
-        _render_strategy_list_tab(strategies, strategies_data, strategy_manager, load_data_func)
+        _render_strategy_list_tab(strategies, strategies_data, strategy_manager, load_data_func, invalidate_data_func)
     
     with tab2:
         _render_add_strategy_tab(strategy_manager, strategies)
@@ -46,7 +81,7 @@ def strategy_management_page_new(load_data_func, get_strategy_manager_func):
         _render_performance_tab(load_data_func)
 
 
-def _render_strategy_list_tab(strategies, strategies_data, strategy_manager, load_data_func):
+def _render_strategy_list_tab(strategies, strategies_data, strategy_manager, load_data_func, invalidate_data_func):
     """手法一覧タブ"""
     st.subheader("📋 登録済み手法一覧")
     
@@ -70,12 +105,12 @@ def _render_strategy_list_tab(strategies, strategies_data, strategy_manager, loa
         selected_strategy = st.selectbox("詳細を表示・編集する手法を選択", [''] + strategies)
         
         if selected_strategy:
-            _render_strategy_detail(selected_strategy, strategy_manager, load_data_func)
+            _render_strategy_detail(selected_strategy, strategy_manager, load_data_func, invalidate_data_func)
     else:
         st.warning("まだ手法が登録されていません。「手法を追加」タブから新しい手法を登録してください。")
 
 
-def _render_strategy_detail(selected_strategy, strategy_manager, load_data_func):
+def _render_strategy_detail(selected_strategy, strategy_manager, load_data_func, invalidate_data_func):
     """手法詳細の表示"""
     st.subheader(f"📖 手法詳細: {selected_strategy}")
     
@@ -149,13 +184,11 @@ def _render_strategy_detail(selected_strategy, strategy_manager, load_data_func)
             st.divider()
             st.write(f"**この手法のトレード一覧（全{len(strategy_trades)}件）**")
             
-            recent_strategy_trades = strategy_trades.sort_values('date', ascending=False)
-            display_cols = ['trade_id', 'date', 'currency_pair', 'type', 'pips', 'net_profit_loss_jpy', 'review_comment']
-            available_cols = [col for col in display_cols if col in recent_strategy_trades.columns]
-            
-            display_df = recent_strategy_trades[available_cols].copy()
-            if 'date' in display_df.columns:
-                display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
+            # 同じデータ・手法では表示用DataFrameを作り直さない
+            data_version = st.session_state.get('data_version', 0)
+            display_df = strategy_trades_display(df, TradeDataManager.content_hash(df), selected_strategy)
+            # 保存後（データ版数の更新後）は編集記録をリセットするため、キーに版数を含める
+            editor_key = f'strategy_trades_editor_{selected_strategy}_{data_version}'
 
             # 編集可能なデータエディター（review_commentのみ編集可能）
             st.write("💡 **ヒント:** review_commentセルをダブルクリックすると編集できます")
@@ -173,11 +206,12 @@ def _render_strategy_detail(selected_strategy, strategy_manager, load_data_func)
                         width='large'
                     )
                 },
-                key=f'strategy_trades_editor_{selected_strategy}'
+                key=editor_key
             )
 
-            # 変更があれば保存
-            if not edited_df.equals(display_df):
+            # 変更があれば保存（全セルの比較はせず、data_editorの編集記録の有無だけを見る）
+            editor_state = st.session_state.get(editor_key)
+            if editor_state and editor_state.get('edited_rows'):
                 st.warning("⚠️ 変更が保存されていません")
                 if st.button("💾 変更を保存", key=f'save_strategy_comments_{selected_strategy}'):
                     sheets_mgr = getattr(strategy_manager, 'sheets_manager', None)
@@ -187,22 +221,21 @@ def _render_strategy_detail(selected_strategy, strategy_manager, load_data_func)
                         with st.spinner('保存中...'):
                             try:
                                 changes_count = 0
-                                for idx in edited_df.index:
-                                    old = display_df.loc[idx, 'review_comment'] if 'review_comment' in display_df.columns else ''
-                                    new = edited_df.loc[idx, 'review_comment']
-                                    if pd.isna(old):
-                                        old = ''
-                                    if pd.isna(new):
-                                        new = ''
-                                    if new != old:
-                                        trade_id = int(edited_df.loc[idx, 'trade_id']) if 'trade_id' in edited_df.columns else None
-                                        if trade_id is not None:
-                                            if sheets_mgr.update_review_comment(trade_id, new):
-                                                changes_count += 1
+                                if 'review_comment' in display_df.columns and 'trade_id' in edited_df.columns:
+                                    # 欠損は空文字として扱い、列単位の比較で変更行だけを取り出す
+                                    new_comments = edited_df['review_comment'].fillna('').to_numpy(dtype=object)
+                                    old_comments = display_df['review_comment'].fillna('').to_numpy(dtype=object)
+                                    changed = new_comments != old_comments
+                                    trade_ids = edited_df['trade_id'].to_numpy(dtype='int64', na_value=-1)[changed]
+                                    if changed.any():
+                                        changes_count = sheets_mgr.bulk_update_review_comments(
+                                            list(zip(trade_ids.tolist(), new_comments[changed].tolist()))
+                                        )
                                 if changes_count > 0:
-                                    st.success(f"✅ {changes_count}件のコメントを保存しました！")
-                                    import time
-                                    time.sleep(1)
+                                    # トーストは再実行後も表示されるため、待機せずにすぐ再実行する
+                                    st.toast(f"✅ {changes_count}件のコメントを保存しました！")
+                                    # トレードデータのキャッシュを無効化（全セッション共有のキャッシュも破棄する）
+                                    invalidate_data_func()
                                     st.rerun()
                                 else:
                                     st.info("変更は見つかりませんでした")
@@ -259,14 +292,12 @@ def _render_add_strategy_tab(strategy_manager, strategies):
 
 def _render_performance_tab(load_data_func):
     """パフォーマンス分析タブ"""
-    from src.data_manager import TradeAnalyzer
-    
     st.subheader("📊 手法別パフォーマンス分析")
     
     df = load_data_func()
     if df is not None and not df.empty:
-        analyzer = TradeAnalyzer(df)
-        strategy_stats = analyzer.analyze_by_strategy()
+        # コメント編集などで再実行されても、データが同じなら集計し直さない
+        strategy_stats = _strategy_stats(df, TradeDataManager.content_hash(df))
         
         if not strategy_stats.empty:
             # グラフで比較
@@ -277,12 +308,11 @@ def _render_performance_tab(load_data_func):
                     strategy_stats.reset_index(),
                     x='strategy',
                     y='合計損益',
-                    title='手法別累積損益',
-                    color='合計損益',
-                    color_continuous_scale=['red', 'yellow', 'green']
+                    title='手法別累積損益'
                 )
+                fig.update_traces(marker_color=profit_bar_colors(strategy_stats['合計損益']))
                 fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             
             with col2:
                 fig = px.scatter(
@@ -293,11 +323,12 @@ def _render_performance_tab(load_data_func):
                     text='strategy',
                     title='手法別: 勝率 vs 平均損益',
                     color='合計損益',
-                    color_continuous_scale='RdYlGn'
+                    color_continuous_scale='RdYlGn',
+                    render_mode='webgl'
                 )
                 fig.update_traces(textposition='top center')
                 fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
             
             # ランキング
             st.divider()
@@ -306,24 +337,27 @@ def _render_performance_tab(load_data_func):
             
             with col1:
                 st.write("**🏆 累積損益ランキング**")
-                top_profit = strategy_stats.nlargest(5, '合計損益')[['合計損益', '勝率']]
-                for idx, (strategy, row) in enumerate(top_profit.iterrows(), 1):
-                    emoji = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else "📊"
-                    st.write(f"{emoji} {strategy}: ¥{row['合計損益']:,.0f} (勝率{row['勝率']:.1f}%)")
+                top_profit = strategy_stats.nlargest(5, '合計損益')
+                st.markdown(ranking_markdown(
+                    f"{strategy}: ¥{profit:,.0f} (勝率{win_rate:.1f}%)"
+                    for strategy, profit, win_rate in zip(top_profit.index, top_profit['合計損益'], top_profit['勝率'])
+                ))
             
             with col2:
                 st.write("**🎯 勝率ランキング**")
-                top_winrate = strategy_stats.nlargest(5, '勝率')[['勝率', '取引数']]
-                for idx, (strategy, row) in enumerate(top_winrate.iterrows(), 1):
-                    emoji = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else "📊"
-                    st.write(f"{emoji} {strategy}: {row['勝率']:.1f}% ({row['取引数']:.0f}回)")
+                top_winrate = strategy_stats.nlargest(5, '勝率')
+                st.markdown(ranking_markdown(
+                    f"{strategy}: {win_rate:.1f}% ({count:.0f}回)"
+                    for strategy, win_rate, count in zip(top_winrate.index, top_winrate['勝率'], top_winrate['取引数'])
+                ))
             
             with col3:
                 st.write("**💰 平均損益ランキング**")
-                top_avg = strategy_stats.nlargest(5, '平均損益')[['平均損益', '取引数']]
-                for idx, (strategy, row) in enumerate(top_avg.iterrows(), 1):
-                    emoji = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else "📊"
-                    st.write(f"{emoji} {strategy}: ¥{row['平均損益']:,.0f} ({row['取引数']:.0f}回)")
+                top_avg = strategy_stats.nlargest(5, '平均損益')
+                st.markdown(ranking_markdown(
+                    f"{strategy}: ¥{avg:,.0f} ({count:.0f}回)"
+                    for strategy, avg, count in zip(top_avg.index, top_avg['平均損益'], top_avg['取引数'])
+                ))
             
             # 推奨とワーニング
             st.divider()
@@ -0,0 +1,106 @@
+"""手法テンプレートのローカルJSON管理モジュール"""
+import atexit
+import json
+import os
+import threading
+import weakref
+from typing import Dict
+
+
+class TemplateStorage:
+    """手法テンプレートをJSONファイルで管理するクラス（書き込みは遅延してまとめて行う）"""
+    
+    def __init__(self, json_path: str = "strategy_templates.json", flush_delay: float = 2.0):
+        """
+        Args:
+            json_path: JSONファイルのパス
+            flush_delay: 最後の変更からファイルに書き込むまでの待ち時間（秒）
+        """
+        self.json_path = json_path
+        self.flush_delay = flush_delay
+        self.templates = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._load_from_file()
+    
+    def _load_from_file(self):
+        """JSONファイルからテンプレートを読み込む"""
+        if not os.path.exists(self.json_path):
+            return
+        try:
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                self.templates = json.load(f)
+            print(f"✓ {len(self.templates)}件の手法テンプレートを読み込みました（{self.json_path}）")
+        except Exception as e:
+            print(f"手法テンプレートの読み込みエラー: {e}")
+            self.templates = {}
+    
+    def get_all_templates(self) -> Dict[str, Dict]:
+        """
+        全てのテンプレートを取得
+        
+        Returns:
+            手法名をキーとした辞書 {手法名: テンプレート}
+        """
+        with self._lock:
+            return dict(self.templates)
+    
+    def save_template(self, name: str, template: Dict):
+        """
+        テンプレートを保存（ファイルへの書き込みはflush_delay秒後にまとめて行う）
+        
+        Args:
+            name: 手法名
+            template: テンプレートの内容
+        """
+        with self._lock:
+            self.templates[name] = template
+            self._dirty = True
+            # 連続した保存は最後の1回にまとめる
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+            # 終了時の保存対象に登録（弱参照なので、不要になったインスタンスは保持し続けない）
+            _dirty_storages.add(self)
+    
+    def flush(self) -> bool:
+        """
+        テンプレートをJSONファイルに書き込む（一時ファイルに書いてから置き換える）
+        
+        Returns:
+            成功時True（未保存の変更がない場合もTrue）、失敗時False
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            tmp_path = f"{self.json_path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.templates, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.json_path)
+                self._dirty = False
+                _dirty_storages.discard(self)
+                print(f"✓ 手法テンプレートを保存しました（{self.json_path}）")
+                return True
+            except Exception as e:
+                print(f"手法テンプレートの保存エラー: {e}")
+                return False
+
+
+# 未書き込みの変更があるTemplateStorage（終了時にまとめて保存する。atexitへの登録はモジュールで1回だけ）
+_dirty_storages = weakref.WeakSet()
+
+
+def _flush_dirty_storages():
+    """終了時に未書き込みの変更を保存"""
+    for storage in list(_dirty_storages):
+        storage.flush()
+
+
+atexit.register(_flush_dirty_storages)